@@ -0,0 +1,293 @@
+"""
+Local control server for scripting Hover from other processes.
+
+Clients connect over a named pipe on Windows or a Unix-domain socket
+elsewhere and exchange length-prefixed JSON frames: a 4-byte big-endian
+payload length followed by UTF-8 JSON. Each request frame is a list of
+commands such as {"cmd": "apply_alpha", "hwnd": 1234, "alpha": 128}; the
+response frame is a list with one {"ok": ..., "result"/"error": ...} entry
+per command, in order. A connection can carry any number of frames.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import struct
+import sys
+import tempfile
+import threading
+import time
+
+HEADER = struct.Struct(">I")
+MAX_FRAME_SIZE = 1024 * 1024
+
+def default_address():
+    """Get the default control address for this platform and user."""
+    if sys.platform == "win32":
+        return r"\\.\pipe\hover-control-" + os.environ.get("USERNAME", "user")
+    return os.path.join(tempfile.gettempdir(), f"hover-control-{os.getuid()}.sock")
+
+def encode_frame(payload):
+    """Encode a JSON-serializable payload as a length-prefixed frame."""
+    data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    if len(data) > MAX_FRAME_SIZE:
+        raise ValueError(f"Frame of {len(data)} bytes exceeds the {MAX_FRAME_SIZE} byte limit")
+    return HEADER.pack(len(data)) + data
+
+def decode_payload(data):
+    """Decode the JSON payload of a frame."""
+    return json.loads(data.decode("utf-8"))
+
+class ControlServer:
+    """Serve batched control commands on a background asyncio loop."""
+
+    def __init__(self, handlers, address=None):
+        self.handlers = dict(handlers)
+        self.address = address or default_address()
+        self.loop = None
+        self.thread = None
+        self.server = None
+        self.clients = set()
+        self.ready = threading.Event()
+        self.start_error = None
+        self.stats = {"connections": 0, "frames": 0, "commands": 0, "errors": 0, "busy_seconds": 0.0}
+
+    def start(self, timeout=5):
+        """Start serving in a daemon thread; returns True once listening."""
+        self.thread = threading.Thread(target=self._run, name="hover-control", daemon=True)
+        self.thread.start()
+        self.ready.wait(timeout)
+        if self.start_error:
+            print(f"Control server failed to start: {self.start_error}")
+            return False
+        return self.ready.is_set()
+
+    def stop(self, timeout=2):
+        """Stop serving and wait for the loop thread to exit."""
+        if self.loop and self.loop.is_running():
+            try:
+                asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result(timeout)
+            except Exception as e:
+                print(f"Error shutting down control server: {e}")
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        if self.thread:
+            self.thread.join(timeout)
+        self.thread = None
+
+    def _run(self):
+        """Run the server's own event loop until stopped."""
+        if sys.platform == "win32":
+            # Named pipes need the proactor loop
+            self.loop = asyncio.ProactorEventLoop()
+        else:
+            self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._listen())
+        except Exception as e:
+            self.start_error = e
+            self.ready.set()
+            self.loop.close()
+            return
+
+        self.ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self._close_listener()
+            self.loop.run_until_complete(self.loop.shutdown_default_executor())
+            self.loop.close()
+
+    async def _shutdown(self):
+        """Stop listening and end every client connection."""
+        self._close_listener()
+        for task in list(self.clients):
+            task.cancel()
+        if self.clients:
+            await asyncio.gather(*self.clients, return_exceptions=True)
+        if self.server is not None and not isinstance(self.server, list):
+            await self.server.wait_closed()
+        self.server = None
+
+    async def _listen(self):
+        """Open the pipe or socket listener."""
+        if sys.platform == "win32":
+            def protocol_factory():
+                reader = asyncio.StreamReader()
+                return asyncio.StreamReaderProtocol(reader, self._handle_client)
+            self.server = await self.loop.start_serving_pipe(protocol_factory, self.address)
+        else:
+            # Remove a stale socket left behind by a previous process
+            if os.path.exists(self.address):
+                os.unlink(self.address)
+            self.server = await asyncio.start_unix_server(self._handle_client, path=self.address)
+            os.chmod(self.address, 0o600)
+
+    def _close_listener(self):
+        """Close the listener and remove the socket file."""
+        if self.server is None:
+            return
+        try:
+            if isinstance(self.server, list):
+                for pipe_server in self.server:
+                    pipe_server.close()
+            elif self.server:
+                self.server.close()
+            if sys.platform != "win32" and os.path.exists(self.address):
+                os.unlink(self.address)
+        except Exception as e:
+            print(f"Error closing control server: {e}")
+
+    async def _handle_client(self, reader, writer):
+        """Answer request frames from one client until it disconnects."""
+        self.stats["connections"] += 1
+        task = asyncio.current_task()
+        self.clients.add(task)
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(HEADER.size)
+                except asyncio.IncompleteReadError:
+                    break
+                (length,) = HEADER.unpack(header)
+                if length > MAX_FRAME_SIZE:
+                    print(f"Control client sent oversized frame ({length} bytes), disconnecting")
+                    break
+                data = await reader.readexactly(length)
+
+                started = time.perf_counter()
+                try:
+                    response = await self._dispatch(decode_payload(data))
+                except ValueError as e:
+                    response = [{"ok": False, "error": f"Malformed request: {e}"}]
+                self.stats["frames"] += 1
+                self.stats["busy_seconds"] += time.perf_counter() - started
+
+                try:
+                    frame = encode_frame(response)
+                except (TypeError, ValueError) as e:
+                    # Keep the connection usable when a result can't be sent back
+                    self.stats["errors"] += 1
+                    frame = encode_frame([{"ok": False, "error": f"Response could not be sent: {e}"}])
+                writer.write(frame)
+                await writer.drain()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"Control client error: {e}")
+        finally:
+            self.clients.discard(task)
+            writer.close()
+
+    async def _dispatch(self, request):
+        """Run a batch of commands in order and collect their results."""
+        if isinstance(request, dict):
+            request = [request]
+        if not isinstance(request, list):
+            raise ValueError("expected a command object or a list of commands")
+
+        results = []
+        for command in request:
+            self.stats["commands"] += 1
+            try:
+                if not isinstance(command, dict) or "cmd" not in command:
+                    raise ValueError("command must be an object with a 'cmd' field")
+                args = dict(command)
+                name = args.pop("cmd")
+                if name == "metrics":
+                    result = {"server": dict(self.stats)}
+                    if "metrics" in self.handlers:
+                        result.update(self.handlers["metrics"]())
+                else:
+                    handler = self.handlers.get(name)
+                    if handler is None:
+                        raise ValueError(f"unknown command '{name}'")
+                    # Handlers may block (e.g. waiting on the UI thread), so keep them off the loop
+                    result = await self.loop.run_in_executor(None, lambda: handler(**args))
+                results.append({"ok": True, "result": result})
+            except Exception as e:
+                self.stats["errors"] += 1
+                results.append({"ok": False, "error": str(e)})
+        return results
+
+def call_with_timeout(func, timeout):
+    """Run a blocking call on a helper thread, giving up after timeout seconds."""
+    outcome = {}
+
+    def run():
+        try:
+            outcome["value"] = func()
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=run, name="hover-control-client", daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        # The helper stays blocked on the pipe, but the caller is free to give up
+        raise TimeoutError(f"Control server did not answer within {timeout} seconds")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome.get("value")
+
+class ControlClient:
+    """Blocking client for sending command batches to a running Hover."""
+
+    def __init__(self, address=None, timeout=5):
+        self.address = address or default_address()
+        self.timeout = timeout
+        if sys.platform == "win32":
+            # Pipe handles have no timeouts of their own
+            self.pipe = call_with_timeout(lambda: open(self.address, "r+b", buffering=0), timeout)
+            self.sock = None
+        else:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(timeout)
+            self.sock.connect(self.address)
+            self.pipe = None
+
+    def send(self, commands):
+        """Send a list of commands and return the list of results."""
+        frame = encode_frame(commands)
+        if self.sock:
+            return self._exchange(frame)
+        return call_with_timeout(lambda: self._exchange(frame), self.timeout)
+
+    def _exchange(self, frame):
+        """Write a request frame and read the response frame."""
+        if self.sock:
+            self.sock.sendall(frame)
+        else:
+            self.pipe.write(frame)
+        (length,) = HEADER.unpack(self._read_exactly(HEADER.size))
+        return decode_payload(self._read_exactly(length))
+
+    def _read_exactly(self, size):
+        """Read exactly size bytes from the connection."""
+        chunks = []
+        while size:
+            chunk = self.sock.recv(size) if self.sock else self.pipe.read(size)
+            if not chunk:
+                raise ConnectionError("Control server closed the connection")
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+    def close(self):
+        """Close the connection."""
+        if self.sock:
+            self.sock.close()
+        if self.pipe:
+            self.pipe.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def send_commands(commands, address=None, timeout=5):
+    """Send one batch of commands over a fresh connection."""
+    with ControlClient(address, timeout) as client:
+        return client.send(commands)
@@ -1,17 +1,47 @@
 import win32gui
 import win32con
 import win32api
+import win32event
+import win32process
+import winerror
+import argparse
 import time
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import messagebox
 import threading
 import os
 import sys
 import pystray
 import signal
 import atexit
+import queue
 from PIL import Image, ImageDraw
 from version import __version__, __title__
+from control import ControlServer, send_commands
+from window_index import WindowIndex
+from power import EngineState, WindowsSignalSource
+from journal import RestoreJournal
+from monitors import MonitorTopology, WindowsDisplay, WindowsDisplayEvents, use_physical_coordinates
+
+# Counters reported by the control server's metrics command
+_engine_metrics = {"alpha_writes": 0, "topmost_writes": 0, "started_at": time.time()}
+
+# Journal of original window state, opened once the single-instance lock is held
+_restore_journal = None
+
+def journal_original_state(hwnd):
+    """Record a window's original state before Hover first changes it."""
+    if _restore_journal is None or _restore_journal.has(hwnd):
+        return
+    try:
+        extended_style = win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)
+        color_key, alpha, layered_flags = 0, 255, 0
+        if extended_style & win32con.WS_EX_LAYERED:
+            color_key, alpha, layered_flags = win32gui.GetLayeredWindowAttributes(hwnd)
+        _, pid = win32process.GetWindowThreadProcessId(hwnd)
+        _restore_journal.record_original(hwnd, pid, extended_style, color_key, alpha, layered_flags)
+    except Exception as e:
+        print(f"Error journaling window {hwnd}: {e}")
 
 def set_window_always_on_top(hwnd, always_on_top):
     """Set the window to always stay on top."""
@@ -20,12 +50,15 @@ def set_window_always_on_top(hwnd, always_on_top):
         if not win32gui.IsWindow(hwnd):
             return False
         
+        journal_original_state(hwnd)
+        
         # Try multiple approaches for better reliability
         attempts = 0
         max_attempts = 3
         
         while attempts < max_attempts:
             try:
+                _engine_metrics["topmost_writes"] += 1
                 if always_on_top:
                     # First attempt: Standard topmost setting
                     result = win32gui.SetWindowPos(hwnd, win32con.HWND_TOPMOST, 0, 0, 0, 0, 
@@ -77,30 +110,61 @@ def set_window_transparent(hwnd, transparency):
         # Check if the window handle is still valid
         if not win32gui.IsWindow(hwnd):
             return False
-            
+        
+        journal_original_state(hwnd)
+        
         extended_style = win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)
         win32gui.SetWindowLong(hwnd, win32con.GWL_EXSTYLE, extended_style | win32con.WS_EX_LAYERED)
         
         # Set the window transparency based on the specified value
+        _engine_metrics["alpha_writes"] += 1
         result = win32gui.SetLayeredWindowAttributes(hwnd, 0, transparency, win32con.LWA_ALPHA)
         return result != 0
     except Exception as e:
         print(f"Error setting window transparency: {e}")
         return False
 
+def _signed_long(value):
+    """Convert an unsigned 32-bit style value back to the signed form SetWindowLong takes."""
+    return value - 0x100000000 if value & 0x80000000 else value
+
+def restore_journaled_style(hwnd, entry):
+    """Put back a window's original layered state; returns its original topmost state if that needs restoring too."""
+    extended_style = win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)
+    # Only put back the bits Hover changes
+    original_layered = entry.ex_style & win32con.WS_EX_LAYERED
+    restored_style = (extended_style & ~win32con.WS_EX_LAYERED) | original_layered
+    if restored_style != extended_style:
+        win32gui.SetWindowLong(hwnd, win32con.GWL_EXSTYLE, _signed_long(restored_style & 0xFFFFFFFF))
+    if original_layered:
+        win32gui.SetLayeredWindowAttributes(hwnd, entry.color_key, entry.alpha, entry.layered_flags)
+    
+    was_topmost = bool(entry.ex_style & win32con.WS_EX_TOPMOST)
+    if was_topmost != bool(extended_style & win32con.WS_EX_TOPMOST):
+        return was_topmost
+    return None
+
 def restore_window_to_normal(hwnd):
-    """Force restore a window to normal state (full opacity, not topmost)."""
+    """Restore a window to how Hover found it, or to full opacity and not topmost if unknown."""
     try:
         if not win32gui.IsWindow(hwnd):
             return False
-            
-        # Remove topmost status
-        win32gui.SetWindowPos(hwnd, win32con.HWND_NOTOPMOST, 0, 0, 0, 0, 
-                             win32con.SWP_NOMOVE | win32con.SWP_NOSIZE | win32con.SWP_NOACTIVATE)
         
-        # Remove layered window style to restore normal transparency
-        extended_style = win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)
-        win32gui.SetWindowLong(hwnd, win32con.GWL_EXSTYLE, extended_style & ~win32con.WS_EX_LAYERED)
+        entry = _restore_journal.get(hwnd) if _restore_journal is not None else None
+        if entry is not None:
+            was_topmost = restore_journaled_style(hwnd, entry)
+            if was_topmost is not None:
+                defer_topmost([hwnd], was_topmost)
+            # Only forget the original state once it has been put back
+            _restore_journal.record_released(hwnd)
+        else:
+            # Remove topmost status
+            win32gui.SetWindowPos(hwnd, win32con.HWND_NOTOPMOST, 0, 0, 0, 0, 
+                                 win32con.SWP_NOMOVE | win32con.SWP_NOSIZE | win32con.SWP_NOACTIVATE)
+            
+            # Remove layered window style to restore normal transparency
+            extended_style = win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)
+            win32gui.SetWindowLong(hwnd, win32con.GWL_EXSTYLE, extended_style & ~win32con.WS_EX_LAYERED)
         
         print(f"Force restored window {hwnd} to normal state")
         return True
@@ -108,12 +172,165 @@ def restore_window_to_normal(hwnd):
         print(f"Error restoring window to normal: {e}")
         return False
 
+# Window groups: linked windows (e.g. a tool palette and its main window)
+# that are revealed and kept on top together with their leader window
+_window_groups = {}  # leader hwnd -> list of member hwnds, leader first
+_window_group_of = {}  # member hwnd -> leader hwnd
+_window_group_pids = {}  # member hwnd -> owning process id when linked
+_window_groups_lock = threading.Lock()
+
+def _unlink_window_locked(hwnd):
+    """Remove a window from its group, dissolving groups left with one window."""
+    leader = _window_group_of.pop(hwnd, None)
+    _window_group_pids.pop(hwnd, None)
+    if leader is None:
+        return
+    group = _window_groups.get(leader, [])
+    if hwnd in group:
+        group.remove(hwnd)
+    if hwnd == leader or len(group) <= 1:
+        _window_groups.pop(leader, None)
+        for member in group:
+            _window_group_of.pop(member, None)
+            _window_group_pids.pop(member, None)
+
+def _window_pid(hwnd):
+    """Get the process owning a window, or None if it is gone."""
+    try:
+        if not win32gui.IsWindow(hwnd):
+            return None
+        return win32process.GetWindowThreadProcessId(hwnd)[1]
+    except Exception:
+        return None
+
+def set_window_group(leader, members):
+    """Link windows to a leader so they reveal and stay on top together."""
+    with _window_groups_lock:
+        _unlink_window_locked(leader)
+        group = [leader]
+        for hwnd in members:
+            if hwnd in group:
+                continue
+            # A window can only belong to one group at a time
+            _unlink_window_locked(hwnd)
+            group.append(hwnd)
+        if len(group) > 1:
+            _window_groups[leader] = group
+            for hwnd in group:
+                _window_group_of[hwnd] = leader
+                _window_group_pids[hwnd] = _window_pid(hwnd)
+        return list(group)
+
+def clear_window_group(hwnd):
+    """Unlink every window in the group hwnd belongs to."""
+    with _window_groups_lock:
+        leader = _window_group_of.get(hwnd, hwnd)
+        group = _window_groups.pop(leader, [])
+        for member in group:
+            _window_group_of.pop(member, None)
+            _window_group_pids.pop(member, None)
+        return group
+
+def get_window_group(hwnd):
+    """Return every window linked with hwnd, including hwnd itself."""
+    with _window_groups_lock:
+        leader = _window_group_of.get(hwnd)
+        if leader is None:
+            return [hwnd]
+        # Drop closed members before their handles can be reused by unrelated windows
+        for member in list(_window_groups.get(leader, [])):
+            if member == hwnd:
+                continue
+            pid = _window_pid(member)
+            if pid is None or pid != _window_group_pids.get(member):
+                _unlink_window_locked(member)
+        leader = _window_group_of.get(hwnd)
+        if leader is None:
+            return [hwnd]
+        return list(_window_groups.get(leader, [hwnd]))
+
+def defer_topmost(hwnds, always_on_top):
+    """Change the topmost state of several windows in one deferred positioning batch."""
+    insert_after = win32con.HWND_TOPMOST if always_on_top else win32con.HWND_NOTOPMOST
+    flags = win32con.SWP_NOMOVE | win32con.SWP_NOSIZE | win32con.SWP_NOACTIVATE
+    # One BeginDeferWindowPos/EndDeferWindowPos batch means a single
+    # z-order change and recomposition for the whole group
+    hdwp = win32gui.BeginDeferWindowPos(len(hwnds))
+    for hwnd in hwnds:
+        hdwp = win32gui.DeferWindowPos(hdwp, hwnd, insert_after, 0, 0, 0, 0, flags)
+    win32gui.EndDeferWindowPos(hdwp)
+    _engine_metrics["topmost_writes"] += 1
+
+def set_group_always_on_top(hwnds, always_on_top):
+    """Set several windows topmost (or not) in one deferred z-order change."""
+    hwnds = [hwnd for hwnd in hwnds if win32gui.IsWindow(hwnd)]
+    if not hwnds:
+        return False
+    if len(hwnds) == 1:
+        return set_window_always_on_top(hwnds[0], always_on_top)
+
+    for hwnd in hwnds:
+        journal_original_state(hwnd)
+    try:
+        defer_topmost(hwnds, always_on_top)
+    except Exception as e:
+        print(f"Deferred positioning failed, falling back to per-window calls: {e}")
+        return all([set_window_always_on_top(hwnd, always_on_top) for hwnd in hwnds])
+
+    if not always_on_top:
+        return True
+
+    # Verify once for the whole batch and only retry the windows that missed
+    time.sleep(0.1)
+    success = True
+    for hwnd in hwnds:
+        extended_style = win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)
+        if not extended_style & win32con.WS_EX_TOPMOST:
+            success = set_window_always_on_top(hwnd, True) and success
+    return success
+
+def set_group_transparent(hwnds, transparency):
+    """Set the transparency of several windows in the same tick."""
+    results = [set_window_transparent(hwnd, transparency) for hwnd in hwnds]
+    return bool(results) and all(results)
+
+def restore_group_to_normal(hwnds):
+    """Force restore several windows to normal state."""
+    results = [restore_window_to_normal(hwnd) for hwnd in hwnds]
+    return bool(results) and all(results)
+
+# Cached monitor layout and window rectangles, set up once the UI starts
+_monitor_topology = None
+
+def is_mouse_over_group(hwnds):
+    """Check if the mouse is over any window in the group."""
+    try:
+        mouse_x, mouse_y = win32api.GetCursorPos()
+        if _monitor_topology is not None:
+            # Cached physical rectangles: the cursor query is the only OS call per tick
+            return _monitor_topology.hit_test(hwnds, (mouse_x, mouse_y))
+        for hwnd in hwnds:
+            if not win32gui.IsWindow(hwnd):
+                continue
+            window_rect = win32gui.GetWindowRect(hwnd)
+            if len(window_rect) != 4:
+                continue
+            if window_rect[0] <= mouse_x <= window_rect[2] and window_rect[1] <= mouse_y <= window_rect[3]:
+                return True
+        return False
+    except Exception as e:
+        print(f"Error checking mouse position: {e}")
+        return False
+
 def is_mouse_over_window(hwnd):
     """Check if the mouse is over the window."""
     try:
         # Check if the window handle is still valid
         if not win32gui.IsWindow(hwnd):
             return False
+        
+        if _monitor_topology is not None:
+            return is_mouse_over_group([hwnd])
             
         mouse_x, mouse_y = win32api.GetCursorPos()
         window_rect = win32gui.GetWindowRect(hwnd)
@@ -134,6 +351,54 @@ def check_hover_and_update(hwnd, transparency):
     else:
         set_window_transparent(hwnd, 0)  # Fully invisible when not hovered
 
+def find_window_by_title(title):
+    """Find a visible window whose title contains the given text."""
+    title = title.lower()
+    for hwnd, window_title in get_all_windows():
+        if title in window_title.lower():
+            return hwnd
+    return None
+
+# Executable names of window-owning processes, keyed by process id
+_process_names = {}
+
+def get_process_name(pid):
+    """Get the executable name of a process, caching it by process id."""
+    name = _process_names.get(pid)
+    if name is None:
+        name = ""
+        try:
+            handle = win32api.OpenProcess(win32con.PROCESS_QUERY_INFORMATION | win32con.PROCESS_VM_READ, False, pid)
+            try:
+                name = os.path.basename(win32process.GetModuleFileNameEx(handle, 0))
+            finally:
+                win32api.CloseHandle(handle)
+        except Exception:
+            # Elevated or protected processes can't be opened; index them by title and class only
+            pass
+        _process_names[pid] = name
+    return name
+
+def get_window_details():
+    """Get visible titled windows with their hwnd, title, class name and process name."""
+    details = []
+    live_pids = set()
+    for hwnd, title in get_all_windows():
+        if not title.strip():
+            continue
+        try:
+            class_name = win32gui.GetClassName(hwnd)
+            _, pid = win32process.GetWindowThreadProcessId(hwnd)
+        except Exception:
+            continue
+        live_pids.add(pid)
+        details.append((hwnd, title, class_name, get_process_name(pid)))
+    
+    # Forget processes that no longer own windows so reused ids aren't misnamed
+    for pid in [pid for pid in _process_names if pid not in live_pids]:
+        del _process_names[pid]
+    return details
+
 def get_all_windows():
     """Get all visible windows with their hwnd and title."""
     def enum_windows_callback(hwnd, lparam):
@@ -189,11 +454,18 @@ def create_tray_icon():
 
     return get_tray_icon()
 
-def create_ui():
+def create_ui(startup_commands=None):
     """Create the UI window using tkinter."""
     selected_hwnd = None
     topmost_monitor_thread = None
     tray_icon = None
+    control_server = None
+    control_handlers = {}
+    engine_state = EngineState()
+    power_source = None
+    display_events = None
+    index_sync_job = None
+    hover_resync = threading.Event()
     
     def show_window():
         """Show the main window."""
@@ -245,18 +517,123 @@ def create_ui():
             print(f"Failed to create system tray icon: {e}")
             return False
     
-    def on_window_select():
-        """Handle window selection from dropdown."""
+    def run_on_ui(func, *args, timeout=5):
+        """Run a function on the Tk thread and wait for its result."""
+        result = queue.Queue(maxsize=1)
+        
+        def call():
+            try:
+                result.put((True, func(*args)))
+            except Exception as e:
+                result.put((False, e))
+        
+        root.after(0, call)
+        try:
+            ok, value = result.get(timeout=timeout)
+        except queue.Empty:
+            # e.g. a modal message box is holding the Tk thread
+            raise TimeoutError(f"UI thread did not respond within {timeout} seconds") from None
+        if not ok:
+            raise value
+        return value
+
+    def setup_control_server():
+        """Start the local control server used for scripted automation."""
+        nonlocal control_server
+        
+        def control_list_windows():
+            return [{"hwnd": hwnd, "title": title, "selected": hwnd == selected_hwnd}
+                    for hwnd, title in get_all_windows()]
+        
+        def control_select(hwnd=None, title=None):
+            if hwnd is None and title:
+                hwnd = find_window_by_title(title)
+                if hwnd is None:
+                    raise ValueError(f"no window titled '{title}'")
+            
+            def select():
+                if not hwnd or not win32gui.IsWindow(hwnd):
+                    raise ValueError(f"window {hwnd} does not exist")
+                on_window_select(hwnd)
+                return selected_hwnd
+            return run_on_ui(select)
+        
+        def control_show():
+            return run_on_ui(show_window) is None
+        
+        def control_apply_alpha(alpha, hwnd=None):
+            alpha = max(0, min(255, int(alpha)))
+            if hwnd is None or hwnd == selected_hwnd:
+                # Route through the slider so the hover loop picks up the new value
+                def apply():
+                    if not selected_hwnd:
+                        raise ValueError("no window selected")
+                    transparency_var.set(alpha)
+                    on_transparency_change()
+                    return selected_hwnd
+                return run_on_ui(apply)
+            return set_group_transparent(get_window_group(hwnd), alpha)
+        
+        def make_toggle(var, handler):
+            def toggle(enabled=None):
+                def apply():
+                    if not selected_hwnd:
+                        raise ValueError("no window selected")
+                    wanted = not var.get() if enabled is None else bool(enabled)
+                    # Already in that state: calling the handler again would start a second loop
+                    if wanted == var.get():
+                        return wanted
+                    var.set(wanted)
+                    handler()
+                    return var.get()
+                return run_on_ui(apply)
+            return toggle
+        
+        def control_restore(hwnd=None):
+            if hwnd is None or hwnd == selected_hwnd:
+                def deselect():
+                    target = selected_hwnd
+                    on_window_select(None)
+                    return target
+                hwnd = run_on_ui(deselect)
+                if not hwnd:
+                    return False
+            return restore_group_to_normal(get_window_group(hwnd))
+        
+        def control_metrics():
+            metrics = {"engine": dict(_engine_metrics), "power": engine_state.metrics()}
+            if _monitor_topology is not None:
+                metrics["display"] = dict(_monitor_topology.stats, monitors=len(_monitor_topology.monitors))
+            return metrics
+        
+        control_handlers.update({
+            "list_windows": control_list_windows,
+            "show": control_show,
+            "select": control_select,
+            "apply_alpha": control_apply_alpha,
+            "toggle_hover": make_toggle(hover_effect_var, on_toggle_hover_effect),
+            "toggle_topmost": make_toggle(always_on_top_var, on_toggle_topmost),
+            "restore": control_restore,
+            "metrics": control_metrics,
+        })
+        
+        try:
+            control_server = ControlServer(control_handlers)
+            if control_server.start():
+                print(f"Control server listening on {control_server.address}")
+                return True
+        except Exception as e:
+            print(f"Failed to start control server: {e}")
+        control_server = None
+        return False
+
+    def on_window_select(new_hwnd=None):
+        """Handle window selection from the picker; None clears the selection."""
         nonlocal selected_hwnd
         global _global_selected_hwnd
-        selection = window_var.get()
         
-        if selection and selection != "Select a window...":
-            # Extract hwnd from the selection string
+        if new_hwnd:
             try:
-                hwnd_str = selection.split(" - ")[0]
-                new_hwnd = int(hwnd_str)
-                
                 # Check if the window is still valid
                 if not win32gui.IsWindow(new_hwnd):
                     messagebox.showwarning("Invalid Window", "The selected window is no longer available. Please refresh the window list.")
@@ -271,9 +648,9 @@ def create_ui():
                             always_on_top_var.set(False)
                             hover_effect_var.set(False)
                             stop_topmost_monitoring()
-                            set_window_always_on_top(selected_hwnd, False)
+                            set_group_always_on_top(get_window_group(selected_hwnd), False)
                             stop_hover_effect(selected_hwnd)
-                            set_window_transparent(selected_hwnd, 255)  # Reset transparency to fully opaque
+                            set_group_transparent(get_window_group(selected_hwnd), 255)  # Reset transparency to fully opaque
                             print(f"Reset previous window {selected_hwnd} to normal state")
                     except Exception as e:
                         print(f"Error resetting previous window: {e}")
@@ -284,6 +661,7 @@ def create_ui():
                 
                 # Enable the control buttons
                 topmost_checkbox.config(state='normal')
+                link_button.config(state='normal')
                 hover_effect_checkbox.config(state='normal')
                 transparency_slider.config(state='normal')
                 
@@ -294,13 +672,15 @@ def create_ui():
                 transparency_percent_label.config(text="100%")
                 
                 # Ensure the new window starts with full opacity
-                set_window_transparent(selected_hwnd, 255)
-                print(f"Selected window {selected_hwnd}: {selection}")
+                set_group_transparent(get_window_group(selected_hwnd), 255)
+                
+                title = win32gui.GetWindowText(selected_hwnd)
+                display_title = title[:50] + "..." if len(title) > 50 else title
+                selected_label.config(text=f"Selected: {display_title}")
+                render_picker()
+                update_minimized_signal()
+                print(f"Selected window {selected_hwnd}: {title}")
                 
-            except (ValueError, IndexError) as e:
-                print(f"Error parsing window selection: {e}")
-                messagebox.showerror("Error", "Invalid window selection format.")
-                refresh_windows()
             except Exception as e:
                 print(f"Unexpected error in window selection: {e}")
                 messagebox.showerror("Error", f"Failed to select window: {e}")
@@ -311,8 +691,8 @@ def create_ui():
                 try:
                     # Clean up current window if valid
                     if win32gui.IsWindow(selected_hwnd):
-                        set_window_transparent(selected_hwnd, 255)
-                        set_window_always_on_top(selected_hwnd, False)
+                        set_group_transparent(get_window_group(selected_hwnd), 255)
+                        set_group_always_on_top(get_window_group(selected_hwnd), False)
                         stop_topmost_monitoring()
                 except Exception as e:
                     print(f"Error cleaning up on deselection: {e}")
@@ -322,36 +702,205 @@ def create_ui():
             _global_selected_hwnd = None
             # Disable the control buttons
             topmost_checkbox.config(state='disabled')
+            link_button.config(state='disabled')
             hover_effect_checkbox.config(state='disabled')
             transparency_slider.config(state='disabled')
             always_on_top_var.set(False)
             hover_effect_var.set(False)
             transparency_var.set(255)
             transparency_percent_label.config(text="100%")
+            selected_label.config(text="No window selected")
+            render_picker()
+            update_minimized_signal()
+    
+    def render_picker():
+        """Draw only the visible slice of the search results into the picker."""
+        nonlocal picker_offset
+        picker_offset = max(0, min(picker_offset, len(picker_results) - PICKER_ROWS))
+        visible = picker_results[picker_offset:picker_offset + PICKER_ROWS]
+        
+        picker_listbox.delete(0, 'end')
+        for row, hwnd in enumerate(visible):
+            entry = window_index.get(hwnd)
+            title = entry.title[:50] + "..." if len(entry.title) > 50 else entry.title
+            label = f"{title}  ({entry.process_name})" if entry.process_name else title
+            picker_listbox.insert('end', label)
+            if hwnd == selected_hwnd:
+                picker_listbox.itemconfig(row, bg="#cce4f7")
+        
+        # Scrollbar reflects the position within the full result list
+        if picker_results:
+            first = picker_offset / len(picker_results)
+            last = min(1.0, (picker_offset + PICKER_ROWS) / len(picker_results))
+            picker_scrollbar.set(first, last)
+        else:
+            picker_scrollbar.set(0, 1)
+        picker_count_label.config(text=f"{len(picker_results)} of {len(window_index)} windows")
+    
+    def update_picker_results(*args):
+        """Re-run the search for the current query."""
+        nonlocal picker_results, picker_offset
+        picker_results = window_index.search(search_var.get())
+        picker_offset = 0
+        render_picker()
+    
+    def on_picker_scroll(action, amount, unit=None):
+        """Move the visible slice of results in response to the scrollbar."""
+        nonlocal picker_offset
+        if action == 'moveto':
+            picker_offset = int(float(amount) * len(picker_results))
+        elif action == 'scroll':
+            step = PICKER_ROWS if unit == 'pages' else 1
+            picker_offset += int(amount) * step
+        render_picker()
+    
+    def on_picker_wheel(event):
+        """Scroll the picker with the mouse wheel."""
+        on_picker_scroll('scroll', -1 if event.delta > 0 else 1, 'units')
+        return "break"
+    
+    def highlight_picker_row(row):
+        """Move the keyboard highlight to a visible picker row."""
+        picker_listbox.selection_clear(0, 'end')
+        picker_listbox.selection_set(row)
+        picker_listbox.activate(row)
+        picker_listbox.see(row)
+    
+    def on_picker_activate(event=None):
+        """Select the window under the highlighted picker row (double-click or Enter)."""
+        rows = picker_listbox.curselection()
+        if not rows:
+            return
+        index = picker_offset + rows[0]
+        if index < len(picker_results):
+            on_window_select(picker_results[index])
+    
+    def on_picker_arrow(step):
+        """Move the highlight, scrolling the visible slice when it reaches an edge."""
+        nonlocal picker_offset
+        rows = picker_listbox.curselection()
+        row = rows[0] if rows else picker_listbox.index('active')
+        visible = min(PICKER_ROWS, len(picker_results) - picker_offset)
+        if visible <= 0:
+            return "break"
+        
+        row += step
+        if row < 0:
+            if picker_offset > 0:
+                picker_offset -= 1
+                render_picker()
+            row = 0
+        elif row >= visible:
+            if picker_offset + visible < len(picker_results):
+                picker_offset += 1
+                render_picker()
+            row = visible - 1
+        highlight_picker_row(row)
+        return "break"
+    
+    def on_search_down(event=None):
+        """Move from the search box into the result list."""
+        if picker_results:
+            picker_listbox.focus_set()
+            highlight_picker_row(0)
+        return "break"
+    
+    def on_search_enter(event=None):
+        """Select the best match for the current query."""
+        if picker_results:
+            on_window_select(picker_results[0])
+    
+    def sync_window_index():
+        """Bring the search index in line with the open windows."""
+        nonlocal picker_results
+        added, removed = window_index.sync(get_window_details())
+        if added or removed:
+            # Keep the current scroll position when the list changes underneath the user
+            picker_results = window_index.search(search_var.get())
+            render_picker()
+    
+    def schedule_index_sync():
+        """Periodically pick up windows that opened or closed while the picker is visible."""
+        nonlocal index_sync_job
+        index_sync_job = None
+        if engine_state.suspended:
+            # Stay idle until the resume callback restarts the timer
+            return
+        try:
+            if root.state() != 'withdrawn':
+                sync_window_index()
+        except Exception as e:
+            print(f"Error updating window list: {e}")
+        index_sync_job = root.after(2000, schedule_index_sync)
+    
+    def restart_index_sync():
+        """Resync the window list once after a suspension and restart its timer."""
+        if index_sync_job is not None:
+            root.after_cancel(index_sync_job)
+        schedule_index_sync()
+    
+    def setup_display_cache():
+        """Cache monitor and window geometry for hit tests, refreshed on display changes and moves."""
+        global _monitor_topology
+        nonlocal display_events
+        try:
+            # Rectangles are only trusted for windows whose moves are hooked
+            topology = MonitorTopology(WindowsDisplay(), require_watch=True)
+            display_events = WindowsDisplayEvents(topology)
+            if not display_events.start():
+                # Without move events the cache would go stale; keep querying every tick
+                print("Display events unavailable, hit tests will query window rectangles directly")
+                display_events.stop()
+                display_events = None
+                return False
+            # Move hooks would only fire into suspended loops, so drop them until resume
+            engine_state.on_suspend(display_events.pause)
+            engine_state.on_resume(display_events.resume)
+            if engine_state.suspended:
+                display_events.pause()
+            _monitor_topology = topology
+            return True
+        except Exception as e:
+            # Hit tests fall back to querying window rectangles every tick
+            print(f"Failed to set up display cache: {e}")
+            display_events = None
+            return False
+    
+    def update_minimized_signal():
+        """Re-evaluate the minimized suspend signal for the current selection."""
+        engine_state.wake()
+        if power_source:
+            try:
+                power_source.check_minimized()
+            except Exception as e:
+                print(f"Error checking minimized state: {e}")
+    
+    def setup_power_signals():
+        """Suspend polling on lock, display-off and minimize; slow it down on battery saver."""
+        nonlocal power_source
+        
+        def managed_windows():
+            return get_window_group(selected_hwnd) if selected_hwnd else []
+        
+        # One resync pass for the window list once the engine resumes
+        engine_state.on_resume(lambda: root.after(0, restart_index_sync))
+        
+        try:
+            power_source = WindowsSignalSource(managed_windows)
+            engine_state.add_source(power_source)
+            return True
+        except Exception as e:
+            print(f"Failed to set up power and session signals: {e}")
+            power_source = None
+            return False
     
     def refresh_windows():
         """Refresh the list of available windows."""
         global _global_selected_hwnd
         try:
-            windows = get_all_windows()
-            window_options = ["Select a window..."]
-            
-            # Filter out invalid windows and sort by title
-            valid_windows = []
-            for hwnd, title in windows:
-                if win32gui.IsWindow(hwnd) and title.strip():
-                    valid_windows.append((hwnd, title))
-            
-            # Sort by title for better user experience
-            valid_windows.sort(key=lambda x: x[1].lower())
-            
-            for hwnd, title in valid_windows:
-                # Limit title length for better display
-                display_title = title[:50] + "..." if len(title) > 50 else title
-                window_options.append(f"{hwnd} - {display_title}")
-            
-            window_dropdown['values'] = window_options
-            window_var.set("Select a window...")
+            window_index.sync(get_window_details())
+            search_var.set("")
+            update_picker_results()
             
             # Reset selection and disable controls
             nonlocal selected_hwnd
@@ -359,8 +908,8 @@ def create_ui():
                 # Clean up previous window state
                 try:
                     if win32gui.IsWindow(selected_hwnd):
-                        set_window_transparent(selected_hwnd, 255)  # Restore full opacity
-                        set_window_always_on_top(selected_hwnd, False)  # Remove topmost
+                        set_group_transparent(get_window_group(selected_hwnd), 255)  # Restore full opacity
+                        set_group_always_on_top(get_window_group(selected_hwnd), False)  # Remove topmost
                 except Exception as e:
                     print(f"Error cleaning up previous window: {e}")
                 stop_topmost_monitoring()
@@ -369,12 +918,16 @@ def create_ui():
             # Clear global tracking variable
             _global_selected_hwnd = None
             topmost_checkbox.config(state='disabled')
+            link_button.config(state='disabled')
             hover_effect_checkbox.config(state='disabled')
             transparency_slider.config(state='disabled')
             always_on_top_var.set(False)
             hover_effect_var.set(False)
             transparency_var.set(255)
             transparency_percent_label.config(text="100%")
+            selected_label.config(text="No window selected")
+            render_picker()
+            update_minimized_signal()
             
         except Exception as e:
             print(f"Error refreshing windows: {e}")
@@ -387,7 +940,7 @@ def create_ui():
             
             if current_topmost:
                 # Enable always-on-top with monitoring
-                success = set_window_always_on_top(selected_hwnd, True)
+                success = set_group_always_on_top(get_window_group(selected_hwnd), True)
                 if success:
                     # Start continuous monitoring
                     start_topmost_monitoring(selected_hwnd)
@@ -399,7 +952,7 @@ def create_ui():
             else:
                 # Disable always-on-top and stop monitoring
                 stop_topmost_monitoring()
-                success = set_window_always_on_top(selected_hwnd, False)
+                success = set_group_always_on_top(get_window_group(selected_hwnd), False)
                 if not success:
                     messagebox.showwarning("Warning", "Failed to remove always-on-top state. The window may have been closed.")
                 print(f"Disabled always-on-top for window {selected_hwnd}")
@@ -449,7 +1002,7 @@ def create_ui():
             # Apply transparency only if hover effect is not active
             # and window is still valid
             if not hover_effect_var.get() and win32gui.IsWindow(selected_hwnd):
-                set_window_transparent(selected_hwnd, transparency_value)
+                set_group_transparent(get_window_group(selected_hwnd), transparency_value)
                 
         except Exception as e:
             print(f"Error in transparency change: {e}")
@@ -462,29 +1015,43 @@ def create_ui():
         error_count = 0
         max_errors = 5
         
+        # Cursor positions must be physical pixels to match the cached window rectangles
+        use_physical_coordinates()
+        
         while hover_effect_var.get() and hwnd == selected_hwnd and error_count < max_errors:
             try:
+                # Sleep through suspensions; afterwards force one fresh transparency update
+                if engine_state.wait_while_suspended(lambda: hover_effect_var.get() and hwnd == selected_hwnd):
+                    last_state = None
+                    continue
+                
                 # Check if the window is still valid
                 if not win32gui.IsWindow(hwnd):
                     print(f"Window {hwnd} no longer valid, stopping hover effect")
                     break
                 
-                # Check current mouse state
-                is_hovering = is_mouse_over_window(hwnd)
+                # The group changed: re-apply the hover state to every member
+                if hover_resync.is_set():
+                    hover_resync.clear()
+                    last_state = None
+                
+                # Check current mouse state; hovering any linked window reveals the group
+                group = get_window_group(hwnd)
+                is_hovering = is_mouse_over_group(group)
                 
                 # Only update transparency if state changed (performance optimization)
                 if is_hovering != last_state:
                     if is_hovering:
                         # Use current transparency slider value when hovered
                         hover_transparency = transparency_var.get()
-                        set_window_transparent(hwnd, hover_transparency)
+                        set_group_transparent(group, hover_transparency)
                     else:
                         # Make window invisible when not hovered
-                        set_window_transparent(hwnd, 0)
+                        set_group_transparent(group, 0)
                     last_state = is_hovering
                 
                 error_count = 0  # Reset error count on successful operation
-                time.sleep(0.05)  # Reduced from 0.1 for better responsiveness
+                time.sleep(engine_state.poll_interval(0.05))  # Reduced from 0.1 for better responsiveness
                 
             except Exception as e:
                 error_count += 1
@@ -496,22 +1063,24 @@ def create_ui():
             # Try to restore window transparency before stopping
             try:
                 current_transparency = transparency_var.get()
-                set_window_transparent(hwnd, current_transparency)
+                set_group_transparent(get_window_group(hwnd), current_transparency)
             except:
                 pass
 
     def stop_hover_effect(hwnd):
         """Stop the hover effect and restore current transparency setting."""
+        # Let a hover loop blocked in a suspension notice it should exit
+        engine_state.wake()
         try:
             if win32gui.IsWindow(hwnd):
                 current_transparency = transparency_var.get()
-                set_window_transparent(hwnd, current_transparency)  # Restore current transparency slider value
+                set_group_transparent(get_window_group(hwnd), current_transparency)  # Restore current transparency slider value
                 print(f"Stopped hover effect for window {hwnd}, restored transparency to {current_transparency}")
         except Exception as e:
             print(f"Error stopping hover effect: {e}")
             # Force restore to full opacity as fallback
             try:
-                set_window_transparent(hwnd, 255)
+                set_group_transparent(get_window_group(hwnd), 255)
                 print(f"Force restored window {hwnd} to full opacity")
             except:
                 pass
@@ -536,18 +1105,24 @@ def create_ui():
         
         while always_on_top_var.get() and hwnd == selected_hwnd:
             try:
+                # Sleep through suspensions; the next pass re-checks the topmost state
+                if engine_state.wait_while_suspended(lambda: always_on_top_var.get() and hwnd == selected_hwnd):
+                    last_check_time = time.time()
+                    continue
+                
                 # Check if the window is still valid
                 if not win32gui.IsWindow(hwnd):
                     print(f"Window {hwnd} is no longer valid, stopping topmost monitoring")
                     break
                 
-                # Check current topmost status
-                current_status = is_window_topmost(hwnd)
+                # Check current topmost status of the window and any linked windows
+                group = get_window_group(hwnd)
+                current_status = all(is_window_topmost(member) for member in group if win32gui.IsWindow(member))
                 
                 # If the window should be topmost but isn't, try to fix it
                 if always_on_top_var.get() and not current_status:
                     print(f"Window {hwnd} lost topmost status, attempting to restore...")
-                    success = set_window_always_on_top(hwnd, True)
+                    success = set_group_always_on_top(group, True)
                     
                     if success:
                         consecutive_failures = 0
@@ -573,11 +1148,11 @@ def create_ui():
                 if current_time - last_check_time > 30:  # Every 30 seconds, do a more thorough check
                     # Force refresh the topmost state
                     if always_on_top_var.get():
-                        set_window_always_on_top(hwnd, True)
+                        set_group_always_on_top(get_window_group(hwnd), True)
                     last_check_time = current_time
                 
                 # Sleep for a short interval before next check
-                time.sleep(0.5)  # Check every 500ms
+                time.sleep(engine_state.poll_interval(0.5))  # Check every 500ms, less often on battery saver
                 
             except Exception as e:
                 print(f"Error in topmost monitoring: {e}")
@@ -608,6 +1183,8 @@ def create_ui():
             # or when selected_hwnd changes
             print("Stopping topmost monitoring...")
             topmost_monitor_thread = None
+            # Let a thread blocked in a suspension notice it should exit
+            engine_state.wake()
 
     def on_close():
         """Handle window close event to disable all effects and reset the selected window."""
@@ -625,18 +1202,18 @@ def create_ui():
                 
                 # Force restore window to normal state regardless of current settings
                 try:
-                    set_window_always_on_top(selected_hwnd, False)
+                    set_group_always_on_top(get_window_group(selected_hwnd), False)
                 except Exception as e:
                     print(f"Error removing topmost: {e}")
                 
                 try:
                     # Use the dedicated restoration function
-                    restore_window_to_normal(selected_hwnd)
+                    restore_group_to_normal(get_window_group(selected_hwnd))
                 except Exception as e:
                     print(f"Error restoring window: {e}")
                     # Fallback: try to set full opacity
                     try:
-                        set_window_transparent(selected_hwnd, 255)
+                        set_group_transparent(get_window_group(selected_hwnd), 255)
                         print(f"Fallback: Set window {selected_hwnd} to full opacity")
                     except Exception as e2:
                         print(f"Fallback also failed: {e2}")
@@ -646,6 +1223,27 @@ def create_ui():
         except Exception as e:
             print(f"Error during cleanup: {e}")
         
+        try:
+            # Stop power signals and release any loops blocked in a suspension
+            engine_state.stop_sources()
+            engine_state.wake()
+        except Exception as e:
+            print(f"Error stopping power signals: {e}")
+        
+        try:
+            # Stop display change and window move notifications
+            if display_events:
+                display_events.stop()
+        except Exception as e:
+            print(f"Error stopping display events: {e}")
+        
+        try:
+            # Stop accepting scripted commands
+            if control_server:
+                control_server.stop()
+        except Exception as e:
+            print(f"Error stopping control server: {e}")
+        
         try:
             # Stop tray icon if it exists
             if tray_icon:
@@ -656,6 +1254,59 @@ def create_ui():
         print("Application cleanup complete")
         root.destroy()
 
+    def on_link_windows():
+        """Choose windows that reveal and stay on top together with the selected window."""
+        if not selected_hwnd:
+            return
+        
+        leader = selected_hwnd
+        current_group = get_window_group(leader)
+        candidates = [(hwnd, title) for hwnd, title in get_all_windows()
+                      if hwnd != leader and title.strip()]
+        candidates.sort(key=lambda x: x[1].lower())
+        
+        dialog = tk.Toplevel(root)
+        dialog.title("Link Windows")
+        dialog.geometry("380x300")
+        dialog.transient(root)
+        
+        tk.Label(dialog, text="Windows shown together with the selected window:").pack(padx=10, pady=(10, 5), anchor='w')
+        
+        listbox = tk.Listbox(dialog, selectmode='multiple')
+        listbox.pack(padx=10, fill='both', expand=True)
+        for index, (hwnd, title) in enumerate(candidates):
+            display_title = title[:50] + "..." if len(title) > 50 else title
+            listbox.insert('end', f"{hwnd} - {display_title}")
+            if hwnd in current_group:
+                listbox.selection_set(index)
+        
+        def apply_links():
+            """Replace the selected window's group with the chosen windows."""
+            old_group = get_window_group(leader)
+            members = [candidates[index][0] for index in listbox.curselection()]
+            new_group = set_window_group(leader, members)
+            
+            # Unlinked windows go back to normal, newly linked ones pick up the current effects
+            removed = [hwnd for hwnd in old_group if hwnd not in new_group]
+            if removed:
+                set_group_always_on_top(removed, False)
+                set_group_transparent(removed, 255)
+            if always_on_top_var.get():
+                set_group_always_on_top(new_group, True)
+            if hover_effect_var.get():
+                # Make the hover loop re-apply its current state to the whole new group
+                hover_resync.set()
+            else:
+                set_group_transparent(new_group, transparency_var.get())
+            
+            print(f"Window {leader} linked with {new_group[1:]}")
+            dialog.destroy()
+        
+        buttons_frame = tk.Frame(dialog)
+        buttons_frame.pack(pady=10)
+        tk.Button(buttons_frame, text="Apply", command=apply_links).pack(side='left', padx=5)
+        tk.Button(buttons_frame, text="Cancel", command=dialog.destroy).pack(side='left', padx=5)
+
     def on_minimize_to_tray():
         """Minimize the window to system tray."""
         hide_to_tray()
@@ -683,18 +1334,44 @@ def create_ui():
         print(f"Could not load icon: {e}")
 
     # Resize the window to make it more spacious
-    root.geometry("400x320")  # Increased height to fit the transparency slider
+    root.geometry("400x520")  # Tall enough for the window picker, transparency slider and link button
 
     # Window selection frame
     selection_frame = tk.Frame(root)
     selection_frame.pack(padx=20, pady=10, fill='x')
     
-    tk.Label(selection_frame, text="Select Window:").pack(anchor='w')
+    tk.Label(selection_frame, text="Select Window (type to search, double-click or Enter to pick):").pack(anchor='w')
+    
+    # Search box and virtualized result list backed by the window index
+    window_index = WindowIndex()
+    picker_results = []
+    picker_offset = 0
+    PICKER_ROWS = 6
+    
+    search_var = tk.StringVar()
+    search_entry = tk.Entry(selection_frame, textvariable=search_var)
+    search_entry.pack(fill='x', pady=(5, 0))
+    search_entry.bind('<Return>', on_search_enter)
+    search_entry.bind('<Down>', on_search_down)
+    search_var.trace_add('write', update_picker_results)
     
-    window_var = tk.StringVar()
-    window_dropdown = ttk.Combobox(selection_frame, textvariable=window_var, state='readonly', width=50)
-    window_dropdown.pack(fill='x', pady=(5, 0))
-    window_dropdown.bind('<<ComboboxSelected>>', lambda e: on_window_select())
+    picker_frame = tk.Frame(selection_frame)
+    picker_frame.pack(fill='x', pady=(2, 0))
+    picker_scrollbar = tk.Scrollbar(picker_frame, orient='vertical', command=on_picker_scroll)
+    picker_scrollbar.pack(side='right', fill='y')
+    picker_listbox = tk.Listbox(picker_frame, height=PICKER_ROWS, exportselection=False, activestyle='none')
+    picker_listbox.pack(side='left', fill='x', expand=True)
+    # Highlighting a row only moves the cursor; a window is picked on double-click or Enter
+    picker_listbox.bind('<Double-Button-1>', on_picker_activate)
+    picker_listbox.bind('<Return>', on_picker_activate)
+    picker_listbox.bind('<Up>', lambda e: on_picker_arrow(-1))
+    picker_listbox.bind('<Down>', lambda e: on_picker_arrow(1))
+    picker_listbox.bind('<MouseWheel>', on_picker_wheel)
+    
+    picker_count_label = tk.Label(selection_frame, text="", fg="gray")
+    picker_count_label.pack(anchor='w')
+    selected_label = tk.Label(selection_frame, text="No window selected")
+    selected_label.pack(anchor='w')
     
     # Refresh button
     refresh_button = tk.Button(selection_frame, text="Refresh Window List", command=refresh_windows)
@@ -704,6 +1381,10 @@ def create_ui():
     tray_button = tk.Button(selection_frame, text="Minimize to Tray", command=on_minimize_to_tray)
     tray_button.pack(pady=(5, 0))
 
+    # Link windows button (enabled once a window is selected)
+    link_button = tk.Button(selection_frame, text="Link Windows...", command=on_link_windows, state='disabled')
+    link_button.pack(pady=(5, 0))
+
     # Controls frame
     controls_frame = tk.Frame(root)
     controls_frame.pack(padx=20, pady=10, fill='x')
@@ -741,15 +1422,16 @@ def create_ui():
     transparency_percent_label.pack(anchor='w')
 
     # Instructions
-    instructions = tk.Label(root, text="Select a window from the dropdown above to enable controls.", 
+    instructions = tk.Label(root, text="Select a window from the list above to enable controls.", 
                            fg="gray", wraplength=350)
     instructions.pack(padx=20, pady=10)
 
     # Bind the close button event to disable effects and reset the selected window
     root.protocol("WM_DELETE_WINDOW", on_close)
 
-    # Initialize with available windows
+    # Initialize with available windows and keep the list current
     refresh_windows()
+    index_sync_job = root.after(2000, schedule_index_sync)
 
     # Set up system tray
     tray_available = setup_tray()
@@ -757,6 +1439,39 @@ def create_ui():
         # If tray setup failed, disable the minimize to tray button
         tray_button.config(state='disabled', text="Tray Unavailable")
 
+    # Suspend polling while nothing managed can be seen
+    setup_power_signals()
+
+    # Cache monitor and window geometry for hover hit tests
+    setup_display_cache()
+
+    # Set up the local control server for scripted automation
+    control_available = setup_control_server()
+    
+    # Apply command-line requests through the same path as a handed-off launch
+    if startup_commands:
+        def apply_startup_commands():
+            if not control_available:
+                # No server to talk to: call the same handlers directly
+                print("Control server unavailable, applying startup commands directly")
+                for command in startup_commands:
+                    args = dict(command)
+                    name = args.pop("cmd")
+                    try:
+                        control_handlers[name](**args)
+                    except Exception as e:
+                        print(f"Startup command failed: {e}")
+                return
+            try:
+                for result in send_commands(startup_commands, control_server.address):
+                    if not result["ok"]:
+                        print(f"Startup command failed: {result['error']}")
+            except Exception as e:
+                print(f"Error applying startup commands: {e}")
+        
+        # Handlers wait on the Tk thread, so only start once the main loop is running
+        root.after(0, lambda: threading.Thread(target=apply_startup_commands, daemon=True).start())
+
     # Start the UI loop
     root.mainloop()
 
@@ -769,18 +1484,163 @@ def cleanup_on_exit():
     if _global_selected_hwnd and win32gui.IsWindow(_global_selected_hwnd):
         try:
             print("Global cleanup: Restoring window to normal state...")
-            restore_window_to_normal(_global_selected_hwnd)
+            restore_group_to_normal(get_window_group(_global_selected_hwnd))
+        except Exception as e:
+            print(f"Global cleanup error: {e}")
+    
+    # Anything else Hover touched (linked or scripted windows) goes back to how it was found
+    if _restore_journal is not None:
+        try:
+            recover_journaled_windows(_restore_journal)
         except Exception as e:
             print(f"Global cleanup error: {e}")
 
+def recover_journaled_windows(journal):
+    """Restore every window in the journal to its original state in one pass."""
+    entries = journal.pending()
+    if not entries:
+        return 0
+    
+    gone = []
+    released = []
+    topmost_on = []
+    topmost_off = []
+    for entry in entries:
+        try:
+            hwnd = entry.hwnd
+            if not win32gui.IsWindow(hwnd):
+                gone.append(hwnd)
+                continue
+            # Window handles get reused; only touch the window if it still belongs to the same process
+            _, pid = win32process.GetWindowThreadProcessId(hwnd)
+            if pid != entry.pid:
+                gone.append(hwnd)
+                continue
+            
+            was_topmost = restore_journaled_style(hwnd, entry)
+            if was_topmost is None:
+                released.append(hwnd)
+            else:
+                (topmost_on if was_topmost else topmost_off).append(hwnd)
+        except Exception as e:
+            print(f"Error recovering window {entry.hwnd}: {e}")
+    
+    # Z-order changes for every recovered window go out as one batch each way
+    for hwnds, always_on_top in ((topmost_off, False), (topmost_on, True)):
+        if hwnds:
+            try:
+                defer_topmost(hwnds, always_on_top)
+                released.extend(hwnds)
+            except Exception as e:
+                print(f"Error recovering topmost state: {e}")
+    
+    # Anything that failed stays journaled so a later --recover can try again
+    for hwnd in gone + released:
+        journal.record_released(hwnd)
+    remaining = len(entries) - len(gone) - len(released)
+    if remaining:
+        print(f"{remaining} window(s) could not be restored and remain in the restore journal")
+    print(f"Recovered {len(released)} window(s) from the restore journal")
+    return len(released)
+
+def open_restore_journal():
+    """Open the restore journal and recover anything left by an abnormal exit."""
+    global _restore_journal
+    try:
+        journal = RestoreJournal()
+    except Exception as e:
+        print(f"Restore journal unavailable: {e}")
+        return None
+    if journal.pending():
+        print("Found windows left changed by a previous run, restoring...")
+        recover_journaled_windows(journal)
+    _restore_journal = journal
+    return journal
+
 def signal_handler(signum, frame):
     """Handle system signals for graceful shutdown."""
     print(f"Received signal {signum}, cleaning up...")
     cleanup_on_exit()
     sys.exit(0)
 
+# Named mutex held for the lifetime of the running instance
+_instance_mutex = None
+
+def acquire_instance_lock():
+    """Take the single-instance lock; returns False if another instance holds it."""
+    global _instance_mutex
+    try:
+        _instance_mutex = win32event.CreateMutex(None, False, f"Local\\{__title__}SingleInstance")
+        return win32api.GetLastError() != winerror.ERROR_ALREADY_EXISTS
+    except Exception as e:
+        # Without a mutex we cannot tell, so run rather than refuse to start
+        print(f"Could not create single-instance lock: {e}")
+        return True
+
+def hand_off_to_running_instance(commands, timeout=5):
+    """Forward commands to the running instance, retrying while it starts up."""
+    deadline = time.time() + timeout
+    while True:
+        try:
+            for result in send_commands(commands, timeout=max(0.1, deadline - time.time())):
+                if not result["ok"]:
+                    print(f"Running instance rejected command: {result['error']}")
+            return True
+        except OSError as e:
+            if time.time() >= deadline:
+                print(f"Could not reach running instance: {e}")
+                return False
+            time.sleep(0.1)
+
+def parse_args(argv=None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Make any window invisible until you hover over it.")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--hwnd", type=int, help="handle of the window to manage")
+    target.add_argument("--title", help="manage the first window whose title contains this text")
+    parser.add_argument("--alpha", type=int, help="window transparency from 0 (invisible) to 255 (opaque)")
+    parser.add_argument("--hover", action="store_true", help="enable the hover effect")
+    parser.add_argument("--topmost", action="store_true", help="keep the window always on top")
+    parser.add_argument("--recover", action="store_true",
+                        help="restore windows left hidden by a previous run, then exit without starting the GUI")
+    return parser.parse_args(argv)
+
+def build_startup_commands(args):
+    """Translate command-line options into control commands."""
+    commands = []
+    if args.hwnd is not None:
+        commands.append({"cmd": "select", "hwnd": args.hwnd})
+    elif args.title:
+        commands.append({"cmd": "select", "title": args.title})
+    if args.alpha is not None:
+        commands.append({"cmd": "apply_alpha", "alpha": args.alpha})
+    if args.topmost:
+        commands.append({"cmd": "toggle_topmost", "enabled": True})
+    if args.hover:
+        commands.append({"cmd": "toggle_hover", "enabled": True})
+    return commands
+
 def main():
     """Main function to run the application."""
+    args = parse_args()
+    startup_commands = build_startup_commands(args)
+    
+    # Only one instance may poll and write window state; later launches hand off and exit
+    if not acquire_instance_lock():
+        if args.recover:
+            print(f"{__title__} is running and owns its windows; close it to restore them")
+            return
+        print(f"{__title__} is already running, forwarding request...")
+        hand_off_to_running_instance([{"cmd": "show"}] + startup_commands)
+        return
+    
+    # Put back anything a killed previous run left hidden or topmost
+    journal = open_restore_journal()
+    if args.recover:
+        if journal:
+            journal.close()
+        return
+    
     print("Starting Window Control application...")
     print("Use the GUI to select a window and apply effects.")
     
@@ -790,7 +1650,7 @@ def main():
     signal.signal(signal.SIGTERM, signal_handler)
     
     # Start the UI - it now handles everything
-    create_ui()
+    create_ui(startup_commands)
 
 if __name__ == "__main__":
     main()
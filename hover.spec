@@ -5,7 +5,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('README.md', '.'), ('hover_icon.ico', '.')],
-    hiddenimports=['win32gui', 'win32con', 'win32api'],
+    hiddenimports=['win32gui', 'win32con', 'win32api', 'win32event', 'win32process', 'win32ts', 'winerror'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
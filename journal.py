@@ -0,0 +1,157 @@
+"""
+Crash-safe journal of the window state Hover has changed.
+
+Before Hover first touches a window it appends the window's original
+extended style, layered alpha and topmost state to a small memory-mapped
+file. Writes land in the shared mapping straight away, so they survive the
+process being killed; the next startup (or `hover.py --recover`) reads the
+journal and puts every window still marked as changed back in one pass.
+
+The file is a 16-byte header followed by two buffers of fixed-size records.
+The header names the active buffer and its record count, and is only
+updated after the records it covers are fully written, so a torn write is
+never read back. Compaction rewrites the live records into the inactive
+buffer and then switches buffers with a single header update, so a crash
+part-way through leaves the previous buffer intact.
+"""
+
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from collections import namedtuple
+
+from version import __title__
+
+MAGIC = b"HVRJ"
+VERSION = 2
+HEADER = struct.Struct("<4sHHI4x")  # magic, version, active buffer, record count
+RECORD = struct.Struct("<QIIIBBB9x")
+
+SAVED = 1  # original state recorded, window may be changed
+RELEASED = 2  # window was restored, nothing to recover
+
+JournalEntry = namedtuple("JournalEntry", ["hwnd", "pid", "ex_style", "color_key", "alpha", "layered_flags"])
+
+def default_path():
+    """Get the journal location in the user's local app data folder."""
+    base = os.environ.get("LOCALAPPDATA") or tempfile.gettempdir()
+    return os.path.join(base, __title__, "restore.journal")
+
+class RestoreJournal:
+    """Append-only, memory-mapped record of windows' original state."""
+
+    def __init__(self, path=None, capacity=1024):
+        self.path = path or default_path()
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        size = HEADER.size + RECORD.size * capacity * 2
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        mode = "r+b" if os.path.exists(self.path) else "w+b"
+        self.file = open(self.path, mode)
+        if os.path.getsize(self.path) < size:
+            self.file.truncate(size)
+        self.map = mmap.mmap(self.file.fileno(), size)
+
+        magic, version, buffer, count = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION or buffer > 1 or count > capacity:
+            # New or unreadable journal: start empty
+            buffer, count = 0, 0
+            self._publish(buffer, count)
+        self.buffer = buffer
+        self.count = count
+        self.live = {entry.hwnd: entry for entry in self._replay()}
+
+    def _publish(self, buffer, count):
+        """Point the header at a buffer and record count."""
+        HEADER.pack_into(self.map, 0, MAGIC, VERSION, buffer, count)
+
+    def _write_record(self, buffer, index, entry, kind):
+        """Write one record into a buffer slot."""
+        RECORD.pack_into(self.map, HEADER.size + (buffer * self.capacity + index) * RECORD.size,
+                         entry.hwnd, entry.pid, entry.ex_style & 0xFFFFFFFF, entry.color_key & 0xFFFFFFFF,
+                         entry.alpha, entry.layered_flags, kind)
+
+    def _replay(self):
+        """Get the entries whose last record says they still need restoring."""
+        live = {}
+        for index in range(self.count):
+            hwnd, pid, ex_style, color_key, alpha, layered_flags, kind = RECORD.unpack_from(
+                self.map, HEADER.size + (self.buffer * self.capacity + index) * RECORD.size)
+            if kind == SAVED:
+                live[hwnd] = JournalEntry(hwnd, pid, ex_style, color_key, alpha, layered_flags)
+            elif kind == RELEASED:
+                live.pop(hwnd, None)
+        return list(live.values())
+
+    def _append(self, entry, kind):
+        """Write one record, then publish it by advancing the header count."""
+        if self.count >= self.capacity:
+            self._compact()
+            if self.count >= self.capacity:
+                raise RuntimeError("Restore journal is full")
+        self._write_record(self.buffer, self.count, entry, kind)
+        self.count += 1
+        self._publish(self.buffer, self.count)
+
+    def _compact(self):
+        """Rewrite the journal with only the windows that still need restoring."""
+        # Fill the inactive buffer, then switch to it with one header update;
+        # until then the header still describes the untouched active buffer
+        target = 1 - self.buffer
+        entries = list(self.live.values())
+        for index, entry in enumerate(entries):
+            self._write_record(target, index, entry, SAVED)
+        self._publish(target, len(entries))
+        self.buffer = target
+        self.count = len(entries)
+
+    def get(self, hwnd):
+        """Get the recorded original state of a window, or None."""
+        return self.live.get(hwnd)
+
+    def has(self, hwnd):
+        """Check whether a window's original state is already recorded."""
+        return hwnd in self.live
+
+    def record_original(self, hwnd, pid, ex_style, color_key=0, alpha=255, layered_flags=0):
+        """Record a window's state before Hover first changes it."""
+        with self.lock:
+            if hwnd in self.live:
+                return False
+            entry = JournalEntry(hwnd, pid, ex_style & 0xFFFFFFFF, color_key, alpha, layered_flags)
+            self._append(entry, SAVED)
+            self.live[hwnd] = entry
+            return True
+
+    def record_released(self, hwnd):
+        """Mark a window as restored so it is skipped on recovery."""
+        with self.lock:
+            entry = self.live.pop(hwnd, None)
+            if entry is None:
+                return False
+            self._append(entry, RELEASED)
+            return True
+
+    def pending(self):
+        """Get the windows that still need restoring."""
+        with self.lock:
+            return list(self.live.values())
+
+    def clear(self):
+        """Forget every record."""
+        with self.lock:
+            self.live = {}
+            self.count = 0
+            self._publish(self.buffer, 0)
+
+    def close(self):
+        """Flush and close the journal file."""
+        with self.lock:
+            if self.map.closed:
+                return
+            self.map.flush()
+            self.map.close()
+            self.file.close()
@@ -0,0 +1,490 @@
+"""
+Cached monitor topology and window rectangles for hover hit testing.
+
+Hit tests compare the cursor against window rectangles in physical pixels.
+Rather than asking the OS for every window rectangle on every tick, the
+topology keeps monitor rectangles, their DPI scale factors, window
+rectangles and each window's monitor in memory. The cache is refreshed only
+when a display change or a window move is reported, so a tick costs a single
+cursor query.
+
+Displays come from a provider: WindowsDisplay talks to the OS, while
+SimulatedDisplay serves a fixed layout so hit testing can be exercised
+against arbitrary mixed-DPI arrangements.
+"""
+
+import threading
+from collections import namedtuple
+
+BASE_DPI = 96
+
+class Monitor(namedtuple("Monitor", ["handle", "rect", "dpi"])):
+    """A monitor's physical rectangle (left, top, right, bottom) and DPI."""
+
+    __slots__ = ()
+
+    @property
+    def scale(self):
+        return self.dpi / BASE_DPI
+
+    @property
+    def logical_rect(self):
+        """The rectangle a DPI-unaware program sees: same origin, scaled-down size."""
+        left, top, right, bottom = self.rect
+        return (left, top, left + round((right - left) / self.scale), top + round((bottom - top) / self.scale))
+
+def rect_contains(rect, point):
+    """Check if a point lies inside a rectangle, edges included."""
+    return rect[0] <= point[0] <= rect[2] and rect[1] <= point[1] <= rect[3]
+
+def intersection_area(a, b):
+    """Get the overlapping area of two rectangles."""
+    width = min(a[2], b[2]) - max(a[0], b[0])
+    height = min(a[3], b[3]) - max(a[1], b[1])
+    return width * height if width > 0 and height > 0 else 0
+
+class MonitorTopology:
+    """In-memory monitor layout and window placement used by hit tests.
+
+    With require_watch set, a window's cached rectangle is only trusted once
+    set_watched() reports that its moves are being delivered; until then it
+    is re-queried on every use.
+    """
+
+    def __init__(self, provider, require_watch=False):
+        self.provider = provider
+        self.require_watch = require_watch
+        self.lock = threading.Lock()
+        self.monitors = []
+        self.windows = {}  # hwnd -> (physical rect, monitor handle)
+        self.watched = set()  # hwnds whose moves and destruction are reported
+        self.missing = set()  # hwnds the provider had no rectangle for
+        self.track_callbacks = []
+        self.stats = {"monitor_refreshes": 0, "window_refreshes": 0, "hit_tests": 0}
+        self.refresh_monitors()
+
+    def on_track(self, callback):
+        """Register a callback for windows entering the cache, e.g. to watch them for moves."""
+        self.track_callbacks.append(callback)
+
+    def refresh_monitors(self):
+        """Reload the monitor layout after a display change."""
+        monitors = list(self.provider.monitors())
+        with self.lock:
+            self.monitors = monitors
+            # Window positions and monitor assignments can change with the layout
+            stale = list(self.windows)
+            self.windows = {}
+            self.watched = set()
+            self.missing = set()
+            self.stats["monitor_refreshes"] += 1
+        for hwnd in stale:
+            self.refresh_window(hwnd)
+
+    def refresh_window(self, hwnd):
+        """Reload one window's rectangle after it moved; returns the rectangle."""
+        rect = self.provider.window_rect(hwnd)
+        with self.lock:
+            self.stats["window_refreshes"] += 1
+            if rect is None:
+                # Remember the miss so closed windows cost nothing on later ticks
+                self.windows.pop(hwnd, None)
+                self.watched.discard(hwnd)
+                self.missing.add(hwnd)
+                return None
+            self.missing.discard(hwnd)
+            is_new = hwnd not in self.windows
+            self.windows[hwnd] = (rect, self._monitor_for_rect(rect))
+        if is_new:
+            for callback in self.track_callbacks:
+                try:
+                    callback(hwnd)
+                except Exception as e:
+                    print(f"Error in window tracking callback: {e}")
+        return rect
+
+    def forget_window(self, hwnd):
+        """Drop a window from the cache."""
+        with self.lock:
+            self.windows.pop(hwnd, None)
+            self.watched.discard(hwnd)
+            self.missing.discard(hwnd)
+
+    def set_watched(self, hwnd, watched=True):
+        """Report whether moves of a cached window are being delivered."""
+        with self.lock:
+            if not watched:
+                self.watched.discard(hwnd)
+            elif hwnd in self.windows:
+                self.watched.add(hwnd)
+
+    def _monitor_for_rect(self, rect):
+        """Get the monitor a window mostly lies on, like MONITOR_DEFAULTTONEAREST."""
+        best = None
+        best_area = 0
+        for monitor in self.monitors:
+            area = intersection_area(rect, monitor.rect)
+            if area > best_area:
+                best, best_area = monitor, area
+        if best is None and self.monitors:
+            # Entirely off-screen: fall back to the monitor nearest its centre
+            center_x, center_y = (rect[0] + rect[2]) / 2, (rect[1] + rect[3]) / 2
+            best = min(self.monitors, key=lambda monitor: _distance_squared(monitor.rect, center_x, center_y))
+        return best.handle if best else None
+
+    def clear_watched(self):
+        """Stop trusting every cached rectangle, e.g. while move hooks are removed."""
+        with self.lock:
+            self.watched = set()
+
+    def window_rect(self, hwnd):
+        """Get a window's physical rectangle, loading it on first use."""
+        cached = self.windows.get(hwnd)
+        if cached is not None and (hwnd in self.watched or not self.require_watch):
+            return cached[0]
+        if cached is None and hwnd in self.missing:
+            return None
+        return self.refresh_window(hwnd)
+
+    def monitor_of(self, hwnd):
+        """Get the monitor a window is assigned to."""
+        if self.window_rect(hwnd) is None:
+            return None
+        handle = self.windows.get(hwnd, (None, None))[1]
+        for monitor in self.monitors:
+            if monitor.handle == handle:
+                return monitor
+        return None
+
+    def monitor_at(self, point):
+        """Get the monitor containing a physical point."""
+        for monitor in self.monitors:
+            if rect_contains(monitor.rect, point):
+                return monitor
+        return None
+
+    def to_physical(self, point):
+        """Convert a point from DPI-unaware (logical) to physical coordinates."""
+        for monitor in self.monitors:
+            if rect_contains(monitor.logical_rect, point):
+                left, top = monitor.rect[0], monitor.rect[1]
+                return (round(left + (point[0] - left) * monitor.scale), round(top + (point[1] - top) * monitor.scale))
+        return point
+
+    def to_logical(self, point):
+        """Convert a point from physical to DPI-unaware (logical) coordinates."""
+        monitor = self.monitor_at(point)
+        if monitor is None:
+            return point
+        left, top = monitor.rect[0], monitor.rect[1]
+        return (round(left + (point[0] - left) / monitor.scale), round(top + (point[1] - top) / monitor.scale))
+
+    def hit_test(self, hwnds, point):
+        """Check if a physical point is over any of the windows, using only cached rectangles."""
+        self.stats["hit_tests"] += 1
+        for hwnd in hwnds:
+            rect = self.window_rect(hwnd)
+            if rect is not None and rect_contains(rect, point):
+                return True
+        return False
+
+def _distance_squared(rect, x, y):
+    """Get the squared distance from a point to the nearest edge of a rectangle."""
+    dx = max(rect[0] - x, 0, x - rect[2])
+    dy = max(rect[1] - y, 0, y - rect[3])
+    return dx * dx + dy * dy
+
+class SimulatedDisplay:
+    """Display provider serving a fixed monitor layout and window rectangles."""
+
+    def __init__(self, monitors=(), windows=None):
+        self.layout = list(monitors)
+        self.rects = dict(windows or {})
+        self.calls = 0  # provider queries, standing in for OS calls
+
+    def monitors(self):
+        self.calls += 1
+        return list(self.layout)
+
+    def clear_watched(self):
+        """Stop trusting every cached rectangle, e.g. while move hooks are removed."""
+        with self.lock:
+            self.watched = set()
+
+    def window_rect(self, hwnd):
+        self.calls += 1
+        return self.rects.get(hwnd)
+
+    def set_layout(self, monitors, topology=None):
+        """Replace the monitor layout, notifying the topology like a display change would."""
+        self.layout = list(monitors)
+        if topology is not None:
+            topology.refresh_monitors()
+
+    def move_window(self, hwnd, rect, topology=None):
+        """Move a window, notifying the topology like a move event would."""
+        if rect is None:
+            self.rects.pop(hwnd, None)
+        else:
+            self.rects[hwnd] = rect
+        if topology is not None:
+            topology.refresh_window(hwnd)
+
+# DPI_AWARENESS_CONTEXT_PER_MONITOR_AWARE_V2
+PER_MONITOR_AWARE_V2 = -4
+
+_thread_dpi_supported = True
+
+def use_physical_coordinates():
+    """Make the calling thread per-monitor DPI aware so OS coordinates are physical pixels.
+
+    Returns the previous awareness context, or None if it could not be changed.
+    """
+    global _thread_dpi_supported
+    if not _thread_dpi_supported:
+        return None
+    try:
+        import ctypes
+        set_context = ctypes.windll.user32.SetThreadDpiAwarenessContext
+        set_context.restype = ctypes.c_void_p
+        set_context.argtypes = [ctypes.c_void_p]
+        return set_context(PER_MONITOR_AWARE_V2)
+    except Exception as e:
+        # Older Windows: coordinates stay in the process's default space
+        print(f"Could not enable per-monitor DPI awareness: {e}")
+        _thread_dpi_supported = False
+        return None
+
+def restore_coordinates(previous):
+    """Put back the awareness context returned by use_physical_coordinates()."""
+    if previous:
+        import ctypes
+        ctypes.windll.user32.SetThreadDpiAwarenessContext(previous)
+
+class WindowsDisplay:
+    """Display provider backed by the Windows monitor and window APIs.
+
+    Queries run per-monitor DPI aware whatever the calling thread's own
+    awareness, so every rectangle is in physical pixels.
+    """
+
+    MDT_EFFECTIVE_DPI = 0
+
+    def monitors(self):
+        import ctypes
+        import win32api
+
+        monitors = []
+        previous = use_physical_coordinates()
+        try:
+            display_monitors = win32api.EnumDisplayMonitors()
+        finally:
+            restore_coordinates(previous)
+        for handle, _, rect in display_monitors:
+            dpi_x = ctypes.c_uint(BASE_DPI)
+            dpi_y = ctypes.c_uint(BASE_DPI)
+            try:
+                ctypes.windll.shcore.GetDpiForMonitor(ctypes.c_void_p(int(handle)), self.MDT_EFFECTIVE_DPI,
+                                                      ctypes.byref(dpi_x), ctypes.byref(dpi_y))
+            except Exception as e:
+                print(f"Could not read monitor DPI: {e}")
+            monitors.append(Monitor(int(handle), tuple(rect), dpi_x.value))
+        return monitors
+
+    def clear_watched(self):
+        """Stop trusting every cached rectangle, e.g. while move hooks are removed."""
+        with self.lock:
+            self.watched = set()
+
+    def window_rect(self, hwnd):
+        import win32gui
+
+        previous = use_physical_coordinates()
+        try:
+            if not win32gui.IsWindow(hwnd):
+                return None
+            rect = win32gui.GetWindowRect(hwnd)
+            return tuple(rect) if len(rect) == 4 else None
+        except Exception:
+            return None
+        finally:
+            restore_coordinates(previous)
+
+class WindowsDisplayEvents:
+    """Feeds display changes and moves of cached windows into a topology.
+
+    Runs a hidden top-level window (display change broadcasts are not sent
+    to message-only windows) and installs location-change hooks only for
+    the processes that own cached windows. While paused the hooks are
+    removed and the topology is reloaded once on resume.
+    """
+
+    EVENT_OBJECT_LOCATIONCHANGE = 0x800B
+    EVENT_OBJECT_DESTROY = 0x8001
+    WINEVENT_OUTOFCONTEXT = 0x0000
+    OBJID_WINDOW = 0
+    # Requests posted to the event thread (WM_APP and up)
+    WM_HOOK_PROCESS = 0x8000
+    WM_PAUSE = 0x8001
+    WM_RESUME = 0x8002
+
+    def __init__(self, topology):
+        self.topology = topology
+        self.hwnd = None
+        self.thread = None
+        self.thread_id = None
+        self.hooked_pids = {}  # pid -> [hook handles]
+        self.paused = False
+        self.running = False
+        self.ready = threading.Event()
+        topology.on_track(self._on_track)
+
+    def start(self):
+        """Start the event thread; returns True once it is delivering events."""
+        self.thread = threading.Thread(target=self._run, name="hover-display-events", daemon=True)
+        self.thread.start()
+        self.ready.wait(5)
+        return self.running
+
+    def stop(self):
+        # A thread that failed to start has already exited
+        if self.thread_id and self.thread and self.thread.is_alive():
+            import win32api
+            import win32con
+            win32api.PostThreadMessage(self.thread_id, win32con.WM_QUIT, 0, 0)
+        self.thread = None
+
+    def pause(self):
+        """Remove every hook and ignore events until resume() is called."""
+        self.paused = True
+        # Moves are no longer reported, so stop trusting cached rectangles straight away
+        self.topology.clear_watched()
+        self._post(self.WM_PAUSE)
+
+    def resume(self):
+        """Reload the topology, which hooks the cached windows' processes again."""
+        self.paused = False
+        self._post(self.WM_RESUME)
+
+    def _post(self, msg, wparam=0):
+        """Queue a request for the event thread, which owns the hooks."""
+        if self.hwnd:
+            import win32gui
+            win32gui.PostMessage(self.hwnd, msg, wparam, 0)
+
+    def _on_track(self, hwnd):
+        """Ask the event thread to watch the process owning a newly cached window."""
+        self._post(self.WM_HOOK_PROCESS, hwnd)
+
+    def _run(self):
+        """Create the event window and pump messages until stopped."""
+        import ctypes
+        from ctypes import wintypes
+        import win32api
+        import win32con
+        import win32gui
+
+        use_physical_coordinates()
+        user32 = ctypes.windll.user32
+        try:
+            self.thread_id = win32api.GetCurrentThreadId()
+
+            window_class = win32gui.WNDCLASS()
+            window_class.lpfnWndProc = self._window_proc
+            window_class.lpszClassName = "HoverDisplayEvents"
+            window_class.hInstance = win32api.GetModuleHandle(None)
+            win32gui.RegisterClass(window_class)
+            self.hwnd = win32gui.CreateWindow(window_class.lpszClassName, "", win32con.WS_POPUP, 0, 0, 0, 0,
+                                              0, 0, window_class.hInstance, None)
+
+            WinEventProc = ctypes.WINFUNCTYPE(None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+                                              wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+            self._win_event_proc = WinEventProc(self._on_win_event)
+            user32.SetWinEventHook.restype = wintypes.HANDLE
+        except Exception as e:
+            print(f"Display event source unavailable: {e}")
+            self.ready.set()
+            return
+
+        # Windows cached before the event window existed still need watching
+        for hwnd in list(self.topology.windows):
+            self._hook_window_process(hwnd)
+
+        self.running = True
+        self.ready.set()
+        win32gui.PumpMessages()
+        self.running = False
+
+        self._unhook_all()
+        try:
+            win32gui.DestroyWindow(self.hwnd)
+        except Exception as e:
+            print(f"Error closing display event window: {e}")
+
+    def _unhook_all(self):
+        """Remove every installed hook; must run on the event thread."""
+        import ctypes
+        from ctypes import wintypes
+
+        for hooks in self.hooked_pids.values():
+            for hook in hooks:
+                ctypes.windll.user32.UnhookWinEvent(wintypes.HANDLE(hook))
+        self.hooked_pids = {}
+
+    def _hook_window_process(self, hwnd):
+        """Install move and destroy hooks for the window's process if it has none yet."""
+        import ctypes
+        from ctypes import wintypes
+        import win32process
+
+        try:
+            _, pid = win32process.GetWindowThreadProcessId(hwnd)
+        except Exception:
+            return
+        if self.paused:
+            return
+        if pid not in self.hooked_pids:
+            # One hook per event: a range would also deliver every show, focus and name change in between
+            hooks = []
+            for event in (self.EVENT_OBJECT_DESTROY, self.EVENT_OBJECT_LOCATIONCHANGE):
+                hook = ctypes.windll.user32.SetWinEventHook(event, event, 0, self._win_event_proc, pid, 0,
+                                                            self.WINEVENT_OUTOFCONTEXT)
+                if hook:
+                    hooks.append(hook)
+            if len(hooks) < 2:
+                # Without both hooks the window stays uncached and is re-queried on every hit test
+                for hook in hooks:
+                    ctypes.windll.user32.UnhookWinEvent(wintypes.HANDLE(hook))
+                print(f"Could not watch window {hwnd} for moves")
+                return
+            self.hooked_pids[pid] = hooks
+        self.topology.set_watched(hwnd)
+
+    def _on_win_event(self, hook, event, hwnd, id_object, id_child, thread_id, event_time):
+        """Refresh a cached window when it moves or is destroyed."""
+        if self.paused or id_object != self.OBJID_WINDOW or hwnd not in self.topology.windows:
+            return
+        if event == self.EVENT_OBJECT_DESTROY:
+            self.topology.forget_window(hwnd)
+        elif event == self.EVENT_OBJECT_LOCATIONCHANGE:
+            self.topology.refresh_window(hwnd)
+
+    def _window_proc(self, hwnd, msg, wparam, lparam):
+        """Handle display changes and hook requests."""
+        import win32con
+        import win32gui
+
+        if msg in (win32con.WM_DISPLAYCHANGE, win32con.WM_SETTINGCHANGE, win32con.WM_DPICHANGED):
+            # Changes while paused are picked up by the reload on resume
+            if not self.paused:
+                self.topology.refresh_monitors()
+        elif msg == self.WM_HOOK_PROCESS:
+            self._hook_window_process(wparam)
+            return 0
+        elif msg == self.WM_PAUSE:
+            self._unhook_all()
+            return 0
+        elif msg == self.WM_RESUME:
+            self.topology.refresh_monitors()
+            return 0
+        return win32gui.DefWindowProc(hwnd, msg, wparam, lparam)
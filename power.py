@@ -0,0 +1,322 @@
+"""
+Engine suspension while nothing Hover manages can be seen.
+
+The hover and topmost loops ask an EngineState whether to run. Signal
+sources report conditions such as a locked session, the display being off
+or every managed window being minimized; while any of them holds, the loops
+block instead of polling and resume together with a single resync pass once
+the last one clears. Battery saver only throttles: the loops keep running
+so hovered windows can still be revealed, but poll less often.
+"""
+
+import threading
+import time
+
+LOCKED = "locked"
+DISPLAY_OFF = "display_off"
+MINIMIZED = "minimized"
+BATTERY_SAVER = "battery_saver"
+
+# Signals that slow polling down instead of stopping it
+THROTTLE_REASONS = {BATTERY_SAVER}
+THROTTLE_FACTOR = 4
+
+class EngineState:
+    """Running/suspended state machine shared by the polling loops."""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.reasons = set()
+        self.throttles = set()
+        self.wakes = 0
+        self.suspended_since = None
+        self.reason_since = {}
+        self.suspend_callbacks = []
+        self.resume_callbacks = []
+        self.sources = []
+        self.generation = 0
+        self.stats = {"suspend_count": 0, "resync_count": 0, "suspended_seconds": 0.0, "reason_seconds": {}}
+
+    @property
+    def suspended(self):
+        return bool(self.reasons)
+
+    def poll_interval(self, interval):
+        """Get how long a loop should sleep between polls given its normal interval."""
+        return interval * THROTTLE_FACTOR if self.throttles else interval
+
+    def add_source(self, source):
+        """Attach a signal source and start it feeding this state."""
+        self.sources.append(source)
+        source.start(self)
+
+    def stop_sources(self):
+        """Stop every attached signal source."""
+        for source in self.sources:
+            try:
+                source.stop()
+            except Exception as e:
+                print(f"Error stopping signal source: {e}")
+        self.sources = []
+
+    def on_suspend(self, callback):
+        """Register a callback for when a suspension starts, e.g. to detach hooks."""
+        self.suspend_callbacks.append(callback)
+
+    def on_resume(self, callback):
+        """Register a callback for the resync pass after a suspension ends."""
+        self.resume_callbacks.append(callback)
+
+    def set_signal(self, reason, active):
+        """Report whether a suspend condition currently holds."""
+        suspended = False
+        resumed = False
+        with self.condition:
+            now = time.monotonic()
+            if reason in THROTTLE_REASONS:
+                if active and reason not in self.throttles:
+                    self.throttles.add(reason)
+                    self.reason_since[reason] = now
+                    print(f"Throttling engine ({reason})")
+                elif not active and reason in self.throttles:
+                    self.throttles.discard(reason)
+                    seconds = self.stats["reason_seconds"]
+                    seconds[reason] = seconds.get(reason, 0.0) + now - self.reason_since.pop(reason)
+                    print(f"Ending engine throttling ({reason} cleared)")
+                return
+            if active and reason not in self.reasons:
+                if not self.reasons:
+                    self.suspended_since = now
+                    self.stats["suspend_count"] += 1
+                    suspended = True
+                    print(f"Suspending engine ({reason})")
+                self.reasons.add(reason)
+                self.reason_since[reason] = now
+            elif not active and reason in self.reasons:
+                self.reasons.discard(reason)
+                seconds = self.stats["reason_seconds"]
+                seconds[reason] = seconds.get(reason, 0.0) + now - self.reason_since.pop(reason)
+                if not self.reasons:
+                    self.stats["suspended_seconds"] += now - self.suspended_since
+                    self.stats["resync_count"] += 1
+                    self.suspended_since = None
+                    self.generation += 1
+                    resumed = True
+                    print(f"Resuming engine ({reason} cleared)")
+                    self.condition.notify_all()
+
+        if suspended:
+            for callback in self.suspend_callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"Error in suspend callback: {e}")
+        if resumed:
+            for callback in self.resume_callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"Error in resume callback: {e}")
+
+    def wake(self):
+        """Wake blocked loops so they can re-check their own stop conditions."""
+        with self.condition:
+            self.wakes += 1
+            self.condition.notify_all()
+
+    def wait_while_suspended(self, should_continue=lambda: True):
+        """Block while suspended; returns True if the caller must resync.
+
+        Returns early without resyncing if should_continue() turns false,
+        which is re-checked whenever wake() is called. should_continue() is
+        always called without the lock held, so it may safely wait on another
+        thread (such as reading Tk variables) that itself calls wake().
+        """
+        with self.condition:
+            if not self.reasons:
+                return False
+            generation = self.generation
+        while True:
+            with self.condition:
+                if not self.reasons:
+                    return self.generation != generation
+                wakes = self.wakes
+            if not should_continue():
+                return False
+            with self.condition:
+                # A wake() since the snapshot means the predicate must be checked again
+                while self.reasons and self.wakes == wakes:
+                    self.condition.wait()
+
+    def metrics(self):
+        """Get suspension counters, including any suspension in progress."""
+        with self.condition:
+            now = time.monotonic()
+            reason_seconds = dict(self.stats["reason_seconds"])
+            for reason, since in self.reason_since.items():
+                reason_seconds[reason] = reason_seconds.get(reason, 0.0) + now - since
+            suspended_seconds = self.stats["suspended_seconds"]
+            if self.suspended_since is not None:
+                suspended_seconds += now - self.suspended_since
+            return {
+                "suspended": bool(self.reasons),
+                "reasons": sorted(self.reasons),
+                "throttled": sorted(self.throttles),
+                "suspend_count": self.stats["suspend_count"],
+                "resync_count": self.stats["resync_count"],
+                "suspended_seconds": suspended_seconds,
+                "reason_seconds": reason_seconds,
+            }
+
+class SimulatedSignalSource:
+    """Signal source driven by hand, for tests and scripted runs."""
+
+    def __init__(self):
+        self.state = None
+
+    def start(self, state):
+        self.state = state
+
+    def stop(self):
+        self.state = None
+
+    def emit(self, reason, active):
+        """Report a signal as if the system had sent it."""
+        if self.state is not None:
+            self.state.set_signal(reason, active)
+
+    def replay(self, events, delay=0):
+        """Report a sequence of (reason, active) signals in order."""
+        for reason, active in events:
+            self.emit(reason, active)
+            if delay:
+                time.sleep(delay)
+
+class WindowsSignalSource:
+    """Session lock, display, battery saver and minimize signals from Windows.
+
+    Runs a hidden message-only window on its own thread. managed_windows is
+    called to get the hwnds whose minimized state should suspend the engine.
+    """
+
+    # Power setting GUIDs from winnt.h
+    GUID_CONSOLE_DISPLAY_STATE = "{6FE69556-704A-47A0-8F24-C28D936FDA47}"
+    GUID_POWER_SAVING_STATUS = "{E00958C0-C213-4ACE-AC77-FECCED2EEEA5}"
+
+    WM_WTSSESSION_CHANGE = 0x02B1
+    WTS_SESSION_LOCK = 0x7
+    WTS_SESSION_UNLOCK = 0x8
+    PBT_POWERSETTINGCHANGE = 0x8013
+    EVENT_SYSTEM_MINIMIZESTART = 0x0016
+    EVENT_SYSTEM_MINIMIZEEND = 0x0017
+    WINEVENT_OUTOFCONTEXT = 0x0000
+
+    def __init__(self, managed_windows):
+        self.managed_windows = managed_windows
+        self.state = None
+        self.hwnd = None
+        self.thread = None
+        self.thread_id = None
+        self.ready = threading.Event()
+
+    def start(self, state):
+        self.state = state
+        self.thread = threading.Thread(target=self._run, name="hover-power-signals", daemon=True)
+        self.thread.start()
+        self.ready.wait(5)
+
+    def stop(self):
+        if self.thread_id:
+            import win32api
+            import win32con
+            win32api.PostThreadMessage(self.thread_id, win32con.WM_QUIT, 0, 0)
+        self.thread = None
+
+    def check_minimized(self):
+        """Suspend if every managed window is minimized."""
+        import win32gui
+        hwnds = [hwnd for hwnd in self.managed_windows() if win32gui.IsWindow(hwnd)]
+        self.state.set_signal(MINIMIZED, bool(hwnds) and all(win32gui.IsIconic(hwnd) for hwnd in hwnds))
+
+    def _run(self):
+        """Create the message window, register for notifications and pump messages."""
+        import ctypes
+        import uuid
+        from ctypes import wintypes
+        import win32api
+        import win32con
+        import win32gui
+        import win32ts
+
+        user32 = ctypes.windll.user32
+        hooks = []
+        power_notifications = []
+        try:
+            self.thread_id = win32api.GetCurrentThreadId()
+
+            window_class = win32gui.WNDCLASS()
+            window_class.lpfnWndProc = self._window_proc
+            window_class.lpszClassName = "HoverPowerSignals"
+            window_class.hInstance = win32api.GetModuleHandle(None)
+            win32gui.RegisterClass(window_class)
+            self.hwnd = win32gui.CreateWindow(window_class.lpszClassName, "", 0, 0, 0, 0, 0,
+                                              win32con.HWND_MESSAGE, 0, window_class.hInstance, None)
+
+            win32ts.WTSRegisterSessionNotification(self.hwnd, win32ts.NOTIFY_FOR_THIS_SESSION)
+
+            user32.RegisterPowerSettingNotification.restype = wintypes.HANDLE
+            for guid in (self.GUID_CONSOLE_DISPLAY_STATE, self.GUID_POWER_SAVING_STATUS):
+                guid_bytes = ctypes.create_string_buffer(uuid.UUID(guid).bytes_le, 16)
+                handle = user32.RegisterPowerSettingNotification(wintypes.HANDLE(self.hwnd), guid_bytes, 0)
+                if handle:
+                    power_notifications.append(handle)
+
+            # Out-of-context WinEvent hooks are delivered through this thread's message loop
+            WinEventProc = ctypes.WINFUNCTYPE(None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+                                              wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+            self._win_event_proc = WinEventProc(lambda *args: self.check_minimized())
+            user32.SetWinEventHook.restype = wintypes.HANDLE
+            hook = user32.SetWinEventHook(self.EVENT_SYSTEM_MINIMIZESTART, self.EVENT_SYSTEM_MINIMIZEEND,
+                                          0, self._win_event_proc, 0, 0, self.WINEVENT_OUTOFCONTEXT)
+            if hook:
+                hooks.append(hook)
+        except Exception as e:
+            print(f"Power signal source unavailable: {e}")
+            self.ready.set()
+            return
+
+        self.ready.set()
+        win32gui.PumpMessages()
+
+        for hook in hooks:
+            user32.UnhookWinEvent(wintypes.HANDLE(hook))
+        for handle in power_notifications:
+            user32.UnregisterPowerSettingNotification(wintypes.HANDLE(handle))
+        try:
+            win32ts.WTSUnRegisterSessionNotification(self.hwnd)
+            win32gui.DestroyWindow(self.hwnd)
+        except Exception as e:
+            print(f"Error closing power signal window: {e}")
+
+    def _window_proc(self, hwnd, msg, wparam, lparam):
+        """Translate session and power messages into engine signals."""
+        import ctypes
+        import uuid
+        import win32con
+        import win32gui
+
+        if msg == self.WM_WTSSESSION_CHANGE:
+            if wparam == self.WTS_SESSION_LOCK:
+                self.state.set_signal(LOCKED, True)
+            elif wparam == self.WTS_SESSION_UNLOCK:
+                self.state.set_signal(LOCKED, False)
+        elif msg == win32con.WM_POWERBROADCAST and wparam == self.PBT_POWERSETTINGCHANGE and lparam:
+            # POWERBROADCAST_SETTING: GUID, DWORD data length, then the data
+            guid = "{" + str(uuid.UUID(bytes_le=ctypes.string_at(lparam, 16))).upper() + "}"
+            value = ctypes.c_ulong.from_address(lparam + 20).value
+            if guid == self.GUID_CONSOLE_DISPLAY_STATE:
+                self.state.set_signal(DISPLAY_OFF, value == 0)
+            elif guid == self.GUID_POWER_SAVING_STATUS:
+                self.state.set_signal(BATTERY_SAVER, value == 1)
+            return True
+        return win32gui.DefWindowProc(hwnd, msg, wparam, lparam)
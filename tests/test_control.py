@@ -0,0 +1,122 @@
+import os
+import socket
+import sys
+import tempfile
+import threading
+
+import pytest
+
+from control import HEADER, MAX_FRAME_SIZE, ControlClient, ControlServer, call_with_timeout, decode_payload
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="exercises the Unix-domain socket transport")
+
+@pytest.fixture
+def server():
+    # Unix socket paths are length-limited, so keep them short
+    address = os.path.join(tempfile.mkdtemp(prefix="hvr"), "control.sock")
+    handlers = {
+        "echo": lambda **kwargs: kwargs,
+        "add": lambda a, b: a + b,
+        "unserializable": lambda: object(),
+        "huge": lambda: "x" * (MAX_FRAME_SIZE + 1),
+        "metrics": lambda: {"engine": {"alpha_writes": 3}},
+    }
+    control_server = ControlServer(handlers, address=address)
+    assert control_server.start()
+    yield control_server
+    control_server.stop()
+
+def raw_request(sock, data):
+    """Send raw frame bytes and read back one response frame."""
+    sock.sendall(HEADER.pack(len(data)) + data)
+    (length,) = HEADER.unpack(sock.recv(HEADER.size, socket.MSG_WAITALL))
+    return decode_payload(sock.recv(length, socket.MSG_WAITALL))
+
+def test_batch_results_come_back_in_order(server):
+    with ControlClient(server.address) as client:
+        results = client.send([{"cmd": "add", "a": 1, "b": 2}, {"cmd": "echo", "x": "y"}])
+    assert results == [{"ok": True, "result": 3}, {"ok": True, "result": {"x": "y"}}]
+
+def test_single_command_object_is_accepted(server):
+    with ControlClient(server.address) as client:
+        assert client.send({"cmd": "add", "a": 2, "b": 2}) == [{"ok": True, "result": 4}]
+
+def test_unknown_and_invalid_commands_fail_individually(server):
+    with ControlClient(server.address) as client:
+        results = client.send([{"cmd": "nope"}, {"no_cmd": 1}, {"cmd": "add", "a": 1}, {"cmd": "add", "a": 1, "b": 1}])
+    assert [result["ok"] for result in results] == [False, False, False, True]
+    assert "unknown command" in results[0]["error"]
+
+def test_connection_carries_many_frames(server):
+    with ControlClient(server.address) as client:
+        for i in range(50):
+            assert client.send([{"cmd": "add", "a": i, "b": 1}]) == [{"ok": True, "result": i + 1}]
+    assert server.stats["frames"] == 50
+    assert server.stats["connections"] == 1
+
+def test_malformed_frames_get_an_error_and_keep_the_connection(server):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(5)
+    sock.connect(server.address)
+    try:
+        for data in (b"{not json", b"\xff\xfe", b"42"):
+            response = raw_request(sock, data)
+            assert response[0]["ok"] is False
+            assert "Malformed request" in response[0]["error"]
+        assert raw_request(sock, b'[{"cmd":"add","a":1,"b":1}]') == [{"ok": True, "result": 2}]
+    finally:
+        sock.close()
+
+def test_oversized_request_frame_disconnects(server):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(5)
+    sock.connect(server.address)
+    try:
+        sock.sendall(HEADER.pack(MAX_FRAME_SIZE + 1))
+        assert sock.recv(1) == b""
+    finally:
+        sock.close()
+
+def test_unsendable_results_return_a_frame_error(server):
+    with ControlClient(server.address) as client:
+        for command in ("unserializable", "huge"):
+            results = client.send([{"cmd": "add", "a": 1, "b": 1}, {"cmd": command}])
+            assert len(results) == 1
+            assert results[0]["ok"] is False
+            assert "could not be sent" in results[0]["error"]
+        # The connection is still usable afterwards
+        assert client.send([{"cmd": "add", "a": 1, "b": 1}]) == [{"ok": True, "result": 2}]
+
+def test_metrics_merge_server_and_handler_counters(server):
+    with ControlClient(server.address) as client:
+        client.send([{"cmd": "echo"}, {"cmd": "nope"}])
+        (result,) = client.send([{"cmd": "metrics"}])
+    assert result["ok"] is True
+    metrics = result["result"]
+    assert metrics["engine"] == {"alpha_writes": 3}
+    assert metrics["server"]["commands"] == 3
+    assert metrics["server"]["errors"] == 1
+    assert metrics["server"]["frames"] == 1
+
+def test_stop_with_connected_client_is_clean(server, capfd):
+    client = ControlClient(server.address)
+    try:
+        assert client.send([{"cmd": "echo"}])[0]["ok"] is True
+        server.stop()
+        assert not os.path.exists(server.address)
+        assert client.sock.recv(1) == b""
+    finally:
+        client.close()
+    captured = capfd.readouterr()
+    assert "Traceback" not in captured.err
+    assert "destroyed but it is pending" not in captured.err
+    assert "Event loop is closed" not in captured.err
+
+def test_call_with_timeout_gives_up_on_a_wedged_call():
+    blocker = threading.Event()
+    with pytest.raises(TimeoutError):
+        call_with_timeout(blocker.wait, 0.05)
+    blocker.set()
+    assert call_with_timeout(lambda: 7, 1) == 7
+    with pytest.raises(ConnectionError):
+        call_with_timeout(lambda: (_ for _ in ()).throw(ConnectionError("gone")), 1)
@@ -0,0 +1,80 @@
+import pytest
+
+from journal import HEADER, RestoreJournal
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "restore.journal")
+
+def reopen(journal):
+    """Drop the journal without cleaning up, like a killed process, and open it again."""
+    journal.map.flush()
+    journal.close()
+    return RestoreJournal(journal.path, journal.capacity)
+
+def test_released_windows_are_not_pending(path):
+    journal = RestoreJournal(path)
+    assert journal.record_original(1, 10, 0x80000, alpha=200)
+    assert not journal.record_original(1, 10, 0)
+    journal.record_original(2, 20, 0x8)
+    assert journal.record_released(1)
+    assert not journal.record_released(1)
+    assert [entry.hwnd for entry in journal.pending()] == [2]
+    journal.close()
+
+def test_pending_entries_survive_reopen(path):
+    journal = RestoreJournal(path)
+    journal.record_original(1, 10, 0xFFFFFFFF, color_key=5, alpha=128, layered_flags=2)
+    journal.record_original(2, 20, 0)
+    journal.record_released(2)
+
+    journal = reopen(journal)
+    entry = journal.get(1)
+    assert (entry.pid, entry.ex_style, entry.color_key, entry.alpha, entry.layered_flags) == (10, 0xFFFFFFFF, 5, 128, 2)
+    assert journal.get(2) is None
+    journal.clear()
+
+    journal = reopen(journal)
+    assert journal.pending() == []
+    journal.close()
+
+def test_full_journal_compacts_to_live_entries(path):
+    journal = RestoreJournal(path, capacity=8)
+    journal.record_original(100, 1, 0x80000, alpha=64)
+    for hwnd in range(20):
+        journal.record_original(hwnd, 1, 0)
+        journal.record_released(hwnd)
+    assert journal.count < journal.capacity
+
+    journal = reopen(journal)
+    assert [entry.hwnd for entry in journal.pending()] == [100]
+    assert journal.get(100).alpha == 64
+    journal.close()
+
+def test_crash_during_compaction_keeps_every_entry(path, monkeypatch):
+    journal = RestoreJournal(path, capacity=4)
+    for hwnd in (1, 2, 3):
+        journal.record_original(hwnd, 1, hwnd)
+    journal.record_released(3)
+    (_, _, buffer, count) = HEADER.unpack_from(journal.map, 0)
+    assert count == journal.capacity
+
+    written = []
+    write_record = journal._write_record
+
+    def crash_after_first_write(*args):
+        if written:
+            raise RuntimeError("killed")
+        written.append(args)
+        write_record(*args)
+
+    monkeypatch.setattr(journal, "_write_record", crash_after_first_write)
+    with pytest.raises(RuntimeError):
+        journal.record_original(4, 1, 4)
+    # The header still points at the old buffer
+    assert HEADER.unpack_from(journal.map, 0)[2:] == (buffer, count)
+
+    monkeypatch.undo()
+    journal = reopen(journal)
+    assert sorted(entry.hwnd for entry in journal.pending()) == [1, 2]
+    journal.close()
@@ -0,0 +1,142 @@
+import pytest
+
+from monitors import Monitor, MonitorTopology, SimulatedDisplay
+
+PRIMARY = Monitor(1, (0, 0, 1920, 1080), 96)
+
+LAYOUTS = {
+    # A 200% monitor to the right of a 100% primary
+    "mixed_dpi": {
+        "monitors": [PRIMARY, Monitor(2, (1920, 0, 5760, 2160), 192)],
+        "window": (2000, 100, 2800, 700),
+        "monitor": 2,
+        "inside": (2400, 400),
+        "outside": (1900, 400),
+        "logical": (2000, 100),
+        "physical": (2080, 200),
+    },
+    # A 150% monitor above and to the left of the primary
+    "negative_origin": {
+        "monitors": [Monitor(2, (-2560, -200, 0, 1240), 144), PRIMARY],
+        "window": (-2000, -100, -1000, 800),
+        "monitor": 2,
+        "inside": (-1500, -50),
+        "outside": (-500, -150),
+        "logical": (-2000, 0),
+        "physical": (-1720, 100),
+    },
+    # A window parked beyond every monitor still gets the nearest one
+    "off_screen": {
+        "monitors": [PRIMARY, Monitor(2, (1920, 0, 3840, 1080), 120)],
+        "window": (5000, 5000, 5200, 5200),
+        "monitor": 2,
+        "inside": (5100, 5100),
+        "outside": (1000, 500),
+        "logical": (1000, 500),
+        "physical": (1000, 500),
+    },
+}
+
+HWND = 42
+
+@pytest.fixture(params=sorted(LAYOUTS))
+def layout(request):
+    case = LAYOUTS[request.param]
+    display = SimulatedDisplay(case["monitors"], {HWND: case["window"]})
+    return case, display, MonitorTopology(display)
+
+def test_hit_test_uses_physical_rects(layout):
+    case, _, topology = layout
+    assert topology.hit_test([HWND], case["inside"])
+    assert not topology.hit_test([HWND], case["outside"])
+    assert not topology.hit_test([HWND + 1], case["inside"])
+
+def test_hit_test_ticks_do_not_query_the_display(layout):
+    case, display, topology = layout
+    topology.hit_test([HWND], case["inside"])
+    calls = display.calls
+    for _ in range(100):
+        topology.hit_test([HWND], case["inside"])
+        topology.hit_test([HWND], case["outside"])
+    assert display.calls == calls
+    assert topology.stats["hit_tests"] == 201
+
+def test_display_is_queried_only_on_layout_change_and_move(layout):
+    case, display, topology = layout
+    topology.hit_test([HWND], case["inside"])
+
+    calls = display.calls
+    display.set_layout(case["monitors"], topology)
+    # One monitor query plus one reload per cached window
+    assert display.calls == calls + 2
+    assert topology.hit_test([HWND], case["inside"])
+
+    calls = display.calls
+    display.move_window(HWND, (10, 10, 20, 20), topology)
+    assert display.calls == calls + 1
+    assert not topology.hit_test([HWND], case["inside"])
+    assert topology.hit_test([HWND], (15, 15))
+    assert display.calls == calls + 1
+
+    display.move_window(HWND, None, topology)
+    assert not topology.hit_test([HWND], (15, 15))
+
+def test_monitor_of_follows_moves_and_layout(layout):
+    case, display, topology = layout
+    assert topology.monitor_of(HWND).handle == case["monitor"]
+    assert topology.monitor_of(HWND + 1) is None
+
+    display.move_window(HWND, (100, 100, 400, 400), topology)
+    assert topology.monitor_of(HWND) == PRIMARY
+
+    display.set_layout([Monitor(3, (0, 0, 2560, 1440), 144)], topology)
+    assert topology.monitor_of(HWND).handle == 3
+
+def test_logical_and_physical_points_round_trip(layout):
+    case, _, topology = layout
+    assert topology.to_physical(case["logical"]) == case["physical"]
+    assert topology.to_logical(case["physical"]) == case["logical"]
+    # Points on no monitor are left alone
+    assert topology.to_physical((100000, 100000)) == (100000, 100000)
+    assert topology.to_logical((100000, 100000)) == (100000, 100000)
+
+def test_missing_windows_are_not_requeried_every_tick(layout):
+    case, display, topology = layout
+    closed = HWND + 1
+    assert not topology.hit_test([HWND, closed], case["outside"])
+    calls = display.calls
+    for _ in range(100):
+        topology.hit_test([closed, HWND], case["outside"])
+    assert display.calls == calls
+
+    # A move report, or forgetting the window, lets it be loaded again
+    display.move_window(closed, (10, 10, 20, 20), topology)
+    assert topology.hit_test([closed], (15, 15))
+    topology.forget_window(closed)
+    assert topology.hit_test([closed], (15, 15))
+
+def test_unwatched_windows_are_requeried_until_watched(layout):
+    case, display, _ = layout
+    topology = MonitorTopology(display, require_watch=True)
+    assert topology.hit_test([HWND], case["inside"])
+
+    # Moves nobody reports are still seen
+    display.move_window(HWND, (10, 10, 20, 20))
+    assert topology.hit_test([HWND], (15, 15))
+
+    topology.set_watched(HWND)
+    calls = display.calls
+    for _ in range(10):
+        topology.hit_test([HWND], (15, 15))
+    assert display.calls == calls
+
+    topology.clear_watched()
+    topology.hit_test([HWND], (15, 15))
+    assert display.calls == calls + 1
+
+    # Watching only applies to cached windows, and a layout change drops it
+    topology.set_watched(HWND + 1)
+    assert HWND + 1 not in topology.watched
+    topology.set_watched(HWND)
+    display.set_layout(case["monitors"], topology)
+    assert HWND not in topology.watched
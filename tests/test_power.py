@@ -0,0 +1,113 @@
+import threading
+import time
+
+import pytest
+
+from power import (BATTERY_SAVER, DISPLAY_OFF, LOCKED, MINIMIZED, THROTTLE_FACTOR, EngineState,
+                   SimulatedSignalSource)
+
+@pytest.fixture
+def state():
+    engine_state = EngineState()
+    engine_state.source = SimulatedSignalSource()
+    engine_state.add_source(engine_state.source)
+    yield engine_state
+    engine_state.stop_sources()
+
+def start_waiter(state, should_continue=lambda: True):
+    """Run wait_while_suspended on a worker thread, like the polling loops do."""
+    outcome = {}
+    thread = threading.Thread(target=lambda: outcome.setdefault("resync", state.wait_while_suspended(should_continue)),
+                              daemon=True)
+    thread.start()
+    return thread, outcome
+
+def test_running_engine_does_not_block(state):
+    assert state.wait_while_suspended() is False
+    assert state.metrics()["suspended"] is False
+
+def test_suspend_until_last_signal_clears_then_resync_once(state):
+    suspends = []
+    resumes = []
+    state.on_suspend(lambda: suspends.append(True))
+    state.on_resume(lambda: resumes.append(True))
+    state.source.replay([(LOCKED, True), (DISPLAY_OFF, True)])
+    thread, outcome = start_waiter(state)
+
+    state.source.emit(LOCKED, False)
+    thread.join(0.1)
+    assert thread.is_alive(), "still suspended while the display is off"
+
+    state.source.emit(DISPLAY_OFF, False)
+    thread.join(1)
+    assert outcome == {"resync": True}
+    assert suspends == [True]
+    assert resumes == [True]
+
+    metrics = state.metrics()
+    assert metrics["suspend_count"] == 1
+    assert metrics["resync_count"] == 1
+    assert metrics["reasons"] == []
+    assert set(metrics["reason_seconds"]) == {LOCKED, DISPLAY_OFF}
+
+def test_repeated_signals_are_idempotent(state):
+    state.source.replay([(MINIMIZED, True), (MINIMIZED, True), (MINIMIZED, False), (MINIMIZED, False)])
+    metrics = state.metrics()
+    assert metrics["suspend_count"] == 1
+    assert metrics["resync_count"] == 1
+
+def test_suspended_time_accumulates(state):
+    state.source.emit(LOCKED, True)
+    time.sleep(0.05)
+    assert state.metrics()["suspended_seconds"] >= 0.05
+    state.source.emit(LOCKED, False)
+    settled = state.metrics()["suspended_seconds"]
+    time.sleep(0.02)
+    assert state.metrics()["suspended_seconds"] == settled
+
+def test_wake_lets_a_stopped_loop_leave_without_resync(state):
+    running = threading.Event()
+    running.set()
+    state.source.emit(LOCKED, True)
+    thread, outcome = start_waiter(state, running.is_set)
+    thread.join(0.05)
+    assert thread.is_alive()
+
+    running.clear()
+    state.wake()
+    thread.join(1)
+    assert outcome == {"resync": False}
+    assert state.suspended
+
+def test_predicate_runs_without_the_lock(state):
+    # Like reading a Tk variable: the predicate waits on another thread that calls wake()
+    helpers = []
+
+    def should_continue():
+        helper = threading.Thread(target=state.wake, daemon=True)
+        helper.start()
+        helper.join(1)
+        helpers.append(helper.is_alive())
+        return len(helpers) < 3
+
+    state.source.emit(LOCKED, True)
+    thread, outcome = start_waiter(state, should_continue)
+    thread.join(2)
+    assert not thread.is_alive()
+    assert helpers == [False, False, False]
+    assert outcome == {"resync": False}
+
+def test_battery_saver_throttles_instead_of_suspending(state):
+    state.on_suspend(lambda: pytest.fail("battery saver must not suspend"))
+    state.source.emit(BATTERY_SAVER, True)
+    assert not state.suspended
+    assert state.wait_while_suspended() is False
+    assert state.poll_interval(0.05) == pytest.approx(0.05 * THROTTLE_FACTOR)
+
+    metrics = state.metrics()
+    assert metrics["throttled"] == [BATTERY_SAVER]
+    assert metrics["suspend_count"] == 0
+
+    state.source.emit(BATTERY_SAVER, False)
+    assert state.poll_interval(0.05) == pytest.approx(0.05)
+    assert BATTERY_SAVER in state.metrics()["reason_seconds"]
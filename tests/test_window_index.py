@@ -0,0 +1,70 @@
+import pytest
+
+from window_index import WindowIndex, ngrams
+
+WINDOWS = [
+    (1, "Notepad - notes.txt", "Notepad", "notepad.exe"),
+    (2, "My Notepad copy", "Edit", "editor.exe"),
+    (3, "readme - xnotepadx", "Edit", "viewer.exe"),
+    (4, "Editor", "Edit", "notepad.exe"),
+    (5, "Settings", "NotepadFrame", "settings.exe"),
+    (6, "Calculator", "CalcFrame", "calc.exe"),
+]
+
+@pytest.fixture
+def index():
+    window_index = WindowIndex()
+    window_index.sync(WINDOWS)
+    return window_index
+
+def test_matches_are_ranked(index):
+    # Title prefix, word prefix, title substring, process name, other fields
+    assert index.search("notepad") == [1, 2, 3, 4, 5]
+    assert index.search("  NOTEPAD ", limit=2) == [1, 2]
+
+def test_every_token_must_match_in_some_field(index):
+    assert index.search("note txt") == [1]
+    assert index.search("editor notepad") == [4, 2]
+    assert index.search("notepad calc") == []
+
+def test_short_queries_scan_every_window(index):
+    assert ngrams("no") == set()
+    assert sorted(index.search("no")) == [1, 2, 3, 4, 5]
+    assert index.search("ca") == [6]
+    assert index.search("zz") == []
+
+def test_trigram_false_positives_are_dropped():
+    index = WindowIndex()
+    index.update(1, "abc bcd")
+    assert index._candidates("abcd") == {1}
+    assert index.search("abcd") == []
+
+def test_empty_query_lists_everything_by_title(index):
+    assert index.search("") == [6, 4, 2, 1, 3, 5]
+    assert index.search("   ", limit=1) == [6]
+
+def test_sync_counts_changes_and_removes_stale_windows(index):
+    assert index.sync(WINDOWS) == (0, 0)
+
+    windows = [window for window in WINDOWS if window[0] != 3]
+    windows[0] = (1, "Notepad - todo.txt", "Notepad", "notepad.exe")
+    windows.append((7, "Terminal", "Console", "cmd.exe"))
+    assert index.sync(windows) == (2, 1)
+    assert 3 not in index
+    assert len(index) == 6
+    assert index.get(1).title == "Notepad - todo.txt"
+    assert index.search("xnotepadx") == []
+    assert index.search("todo") == [1]
+
+def test_postings_are_cleaned_up(index):
+    assert index.update(6, "Calendar", "CalcFrame", "calc.exe")
+    assert not index.update(6, "Calendar", "CalcFrame", "calc.exe")
+    assert "lat" not in index.postings
+    assert index.postings["end"] == {6}
+
+    for hwnd, *_ in WINDOWS:
+        assert index.remove(hwnd)
+    assert not index.remove(1)
+    assert index.postings == {}
+    assert index.fields == {}
+    assert index.search("notepad") == []
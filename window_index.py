@@ -0,0 +1,137 @@
+"""
+In-memory search index over open windows for the window picker.
+
+Titles, class names and process names are broken into trigrams so a typed
+query only has to look at windows sharing its trigrams instead of scanning
+every entry. The index is kept in step with the desktop by calling sync()
+with the current window list, which only touches windows that appeared,
+disappeared or changed.
+"""
+
+from collections import namedtuple
+
+WindowEntry = namedtuple("WindowEntry", ["hwnd", "title", "class_name", "process_name"])
+
+NGRAM_SIZE = 3
+
+def ngrams(text):
+    """Get the set of trigrams in a lowercased piece of text."""
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+class WindowIndex:
+    """Trigram index over window titles, classes and process names."""
+
+    def __init__(self):
+        self.entries = {}  # hwnd -> WindowEntry
+        self.fields = {}  # hwnd -> (title, class name, process name), lowercased
+        self.postings = {}  # trigram -> set of hwnds
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, hwnd):
+        return hwnd in self.entries
+
+    def get(self, hwnd):
+        """Get the entry for a window, or None if it is not indexed."""
+        return self.entries.get(hwnd)
+
+    def update(self, hwnd, title, class_name="", process_name=""):
+        """Add or refresh a window; returns True if anything changed."""
+        entry = WindowEntry(hwnd, title, class_name, process_name)
+        if self.entries.get(hwnd) == entry:
+            return False
+        self.remove(hwnd)
+
+        fields = (title.lower(), class_name.lower(), process_name.lower())
+        self.entries[hwnd] = entry
+        self.fields[hwnd] = fields
+        for gram in ngrams(fields[0]) | ngrams(fields[1]) | ngrams(fields[2]):
+            self.postings.setdefault(gram, set()).add(hwnd)
+        return True
+
+    def remove(self, hwnd):
+        """Drop a window from the index; returns True if it was indexed."""
+        if hwnd not in self.entries:
+            return False
+        fields = self.fields.pop(hwnd)
+        del self.entries[hwnd]
+        for gram in ngrams(fields[0]) | ngrams(fields[1]) | ngrams(fields[2]):
+            hwnds = self.postings.get(gram)
+            if hwnds is not None:
+                hwnds.discard(hwnd)
+                if not hwnds:
+                    del self.postings[gram]
+        return True
+
+    def sync(self, windows):
+        """Bring the index in line with the given window entries.
+
+        Returns the number of windows added or changed and the number removed.
+        """
+        seen = set()
+        changed = 0
+        for window in windows:
+            seen.add(window[0])
+            if self.update(*window):
+                changed += 1
+        stale = [hwnd for hwnd in self.entries if hwnd not in seen]
+        for hwnd in stale:
+            self.remove(hwnd)
+        return changed, len(stale)
+
+    def _candidates(self, token):
+        """Get the windows that could contain a query token."""
+        grams = ngrams(token)
+        if not grams:
+            # Too short for trigrams; such queries are cheap to check directly
+            return set(self.entries)
+        candidates = None
+        for gram in sorted(grams, key=lambda g: len(self.postings.get(g, ()))):
+            hwnds = self.postings.get(gram)
+            if not hwnds:
+                return set()
+            candidates = set(hwnds) if candidates is None else candidates & hwnds
+            if not candidates:
+                break
+        return candidates
+
+    def _rank(self, hwnd, query, tokens):
+        """Score a matching window; lower scores rank first."""
+        title, class_name, process_name = self.fields[hwnd]
+        if title.startswith(query):
+            score = 0
+        elif any(word.startswith(tokens[0]) for word in title.split()):
+            score = 1
+        elif all(token in title for token in tokens):
+            score = 2
+        elif all(token in process_name for token in tokens):
+            score = 3
+        else:
+            score = 4
+        return (score, title, hwnd)
+
+    def search(self, query, limit=None):
+        """Find windows matching every word of the query, best matches first."""
+        query = query.strip().lower()
+        tokens = query.split()
+        if not tokens:
+            ordered = sorted(self.entries, key=lambda hwnd: (self.fields[hwnd][0], hwnd))
+            return ordered[:limit] if limit is not None else ordered
+
+        candidates = None
+        for token in tokens:
+            hwnds = self._candidates(token)
+            candidates = hwnds if candidates is None else candidates & hwnds
+            if not candidates:
+                return []
+
+        # Trigram hits can be false positives, so confirm each token really occurs
+        matches = []
+        for hwnd in candidates:
+            fields = self.fields[hwnd]
+            if all(any(token in field for field in fields) for token in tokens):
+                matches.append(hwnd)
+
+        matches.sort(key=lambda hwnd: self._rank(hwnd, query, tokens))
+        return matches[:limit] if limit is not None else matches